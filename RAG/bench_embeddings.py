@@ -0,0 +1,121 @@
+# Embedding backend benchmark: torch (HuggingFaceEmbeddings) vs onnx-int8 (ONNX Runtime).
+# Usage: python RAG/bench_embeddings.py [--backends torch,onnx-int8] [--queries 200] [--json]
+#
+# Each backend runs in its own process so resident memory is not shared: load time,
+# single-query latency p50/p95/p99 (uncached embed_query, KB questions) and resident memory.
+# The cosine parity of each backend against torch is reported alongside.
+
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+try:  # run as a script from RAG/ or imported as RAG.bench_embeddings
+    from onnx_embeddings import (EMBEDDING_BACKENDS, EMBEDDING_MODEL, export_quantized,
+                                 make_embeddings, parity_check)
+except ImportError:
+    from .onnx_embeddings import (EMBEDDING_BACKENDS, EMBEDDING_MODEL, export_quantized,
+                                  make_embeddings, parity_check)
+
+BASE_DIR = Path(__file__).parent.resolve()
+DEFAULT_KB_PATH = BASE_DIR / "data" / "kb.jsonl"
+
+
+def load_questions(kb_path: Path, n: int) -> List[str]:
+    with open(kb_path, "r", encoding="utf-8") as f:
+        questions = [json.loads(line)["question"] for line in f if line.strip()]
+    return [questions[i % len(questions)] for i in range(n)]
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak ru_maxrss would include the parent's, inherited across exec)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KiB
+
+
+def bench_backend(backend: str, questions: List[str], model_name: str = EMBEDDING_MODEL) -> Dict:
+    """Measured in the current process: call through run_isolated() to compare backends."""
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    emb = make_embeddings(backend, model_name)
+    emb.embed_query("warmup")
+    load_s = time.perf_counter() - start
+    rss_loaded = rss_mb()
+
+    latencies = []
+    for q in questions:
+        t0 = time.perf_counter()
+        emb.embed_query(q)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "latency_ms": {f"p{p}": round(float(np.percentile(latencies, p)), 2) for p in (50, 95, 99)},
+        "mean_ms": round(float(np.mean(latencies)), 2),
+        "rss_mb": round(rss_mb(), 1),
+        "model_rss_mb": round(rss_loaded - rss_before, 1),
+    }
+
+
+def run_isolated(backend: str, kb_path: Path, n_queries: int, model_name: str) -> Dict:
+    out = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--child", backend, "--kb", str(kb_path),
+         "--queries", str(n_queries), "--model", model_name],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backends: per-query latency, memory, parity")
+    parser.add_argument("--backends", default=",".join(EMBEDDING_BACKENDS))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--kb", default=str(DEFAULT_KB_PATH))
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--no-parity", action="store_true", help="skip the cosine check against torch")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    questions = load_questions(Path(args.kb), args.queries)
+    if args.child:
+        print(json.dumps(bench_backend(args.child, questions, args.model)))
+        return
+
+    backends = [b for b in args.backends.split(",") if b]
+    print(f"📊 Embedding benchmark: backends={backends} queries={args.queries}")
+    if "onnx-int8" in backends:
+        export_quantized(args.model)  # one-time export stays out of the measured load
+    report = []
+    for backend in backends:
+        row = run_isolated(backend, Path(args.kb), args.queries, args.model)
+        report.append(row)
+        lat = row["latency_ms"]
+        print(f"   {backend:<10} p50={lat['p50']}ms p95={lat['p95']}ms p99={lat['p99']}ms "
+              f"rss={row['rss_mb']}MB (model {row['model_rss_mb']}MB) load={row['load_s']}s")
+
+    if not args.no_parity and any(b != "torch" for b in backends):
+        reference = make_embeddings("torch", args.model)
+        for row in report:
+            if row["backend"] != "torch":
+                row["parity_vs_torch"] = parity_check(reference, make_embeddings(row["backend"], args.model),
+                                                      sentences=sorted(set(questions))[:50])
+                print(f"   🎯 {row['backend']} vs torch: {row['parity_vs_torch']}")
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
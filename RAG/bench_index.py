@@ -0,0 +1,127 @@
+# Index-type benchmark: flat vs HNSW vs IVF-PQ on synthetic embeddings (no model needed).
+# Usage: python RAG/bench_index.py [--sizes 10000,100000,1000000] [--types flat,hnsw,ivfpq] [--json]
+#
+# Per corpus size and index type: build time, recall@k against the exact flat results,
+# single-query latency p50/p95/p99 and memory footprint (serialized index bytes).
+
+from typing import Dict, List
+import argparse
+import json
+import math
+import time
+
+import faiss
+import numpy as np
+
+try:  # run as a script from RAG/ or imported as RAG.bench_index
+    from build_index import INDEX_TYPES, index_spec, make_index
+except ImportError:
+    from .build_index import INDEX_TYPES, index_spec, make_index
+
+DIM = 384  # paraphrase-multilingual-MiniLM-L12-v2
+
+
+def synthetic_corpus(n: int, dim: int = DIM, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """Unit vectors around `clusters` topics: closer to real sentence embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):  # bounded temporaries for the 1M corpus
+        stop = min(n, start + 100_000)
+        labels = rng.integers(0, clusters, stop - start)
+        out[start:stop] = centers[labels] + 0.8 * rng.standard_normal((stop - start, dim)).astype(np.float32)
+    faiss.normalize_L2(out)
+    return out
+
+
+def synthetic_queries(corpus: np.ndarray, n: int, seed: int = 1) -> np.ndarray:
+    """Paraphrase-like queries: corpus vectors plus noise."""
+    rng = np.random.default_rng(seed)
+    q = corpus[rng.integers(0, len(corpus), n)] + 0.05 * rng.standard_normal((n, corpus.shape[1])).astype(np.float32)
+    faiss.normalize_L2(q)
+    return q
+
+
+def auto_nlist(n: int) -> int:
+    """~4*sqrt(n) lists, rounded to a power of two (10k -> 512, 100k -> 1024, 1M -> 4096)."""
+    return 2 ** round(math.log2(4 * math.sqrt(n)))
+
+
+def percentiles_ms(samples: List[float]) -> Dict[str, float]:
+    return {f"p{p}": round(float(np.percentile(samples, p)), 3) for p in (50, 95, 99)}
+
+
+def bench_type(corpus, queries, truth, spec: dict, k: int) -> dict:
+    start = time.perf_counter()
+    ids = np.arange(len(corpus), dtype=np.int64)
+    if spec["type"] == "ivfpq":
+        rng = np.random.default_rng(2)
+        sample = corpus[rng.choice(len(corpus), min(len(corpus), 64 * spec["nlist"]), replace=False)]
+        index = make_index(corpus.shape[1], spec, train_vectors=sample)
+    else:
+        index = make_index(corpus.shape[1], spec)
+    index.add_with_ids(corpus, ids)
+    build_s = time.perf_counter() - start
+
+    latencies, found = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        _, idx = index.search(q.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        found.append(idx[0])
+    recall = float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+    size = int(faiss.serialize_index(index).nbytes)
+    return {
+        "index": spec,
+        "build_s": round(build_s, 2),
+        f"recall@{k}": round(recall, 4),
+        "latency_ms": percentiles_ms(latencies),
+        "memory_mb": round(size / 2**20, 1),
+        "bytes_per_vector": round(size / len(corpus), 1),
+    }
+
+
+def bench_indexes(sizes: List[int], types: List[str], k: int = 3, n_queries: int = 500, **params) -> List[dict]:
+    """params override DEFAULT_INDEX_PARAMS (nlist defaults to auto_nlist(corpus size))."""
+    report = []
+    for n in sizes:
+        corpus = synthetic_corpus(n)
+        queries = synthetic_queries(corpus, n_queries)
+        exact = faiss.IndexFlatL2(corpus.shape[1])
+        exact.add(corpus)
+        _, truth = exact.search(queries, k)
+        del exact
+        for index_type in types:
+            spec = index_spec(index_type, **{"nlist": auto_nlist(n), **params})
+            row = {"corpus": n, **bench_type(corpus, queries, truth, spec, k)}
+            report.append(row)
+            lat = row["latency_ms"]
+            print(f"   {n:>8} {index_type:<6} recall@{k}={row[f'recall@{k}']:.3f} "
+                  f"p50={lat['p50']:.3f}ms p95={lat['p95']:.3f}ms p99={lat['p99']:.3f}ms "
+                  f"mem={row['memory_mb']}MB build={row['build_s']}s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS index types: recall vs flat, latency, memory")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    for name in ("M", "efSearch", "nlist", "m", "nprobe"):
+        parser.add_argument(f"--{name}", type=int, default=None, help="override the index default")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    types = [t for t in args.types.split(",") if t]
+    print(f"📊 Index benchmark: sizes={sizes} types={types} k={args.k} queries={args.queries}")
+    params = {name: getattr(args, name) for name in ("M", "efSearch", "nlist", "m", "nprobe")
+              if getattr(args, name) is not None}
+    report = bench_indexes(sizes, types, k=args.k, n_queries=args.queries, **params)
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# End-to-end RAG benchmark: replays every kb.jsonl question plus paraphrased and
+# ASR-corrupted variants through RAGKnowledgeBase.search_with_metadata.
+# Usage: python RAG/bench_rag.py [--variants original,paraphrase,asr] [--out runs/rag.json]
+#
+# Per variant: throughput, latency p50/p95/p99 split into embedding and search time,
+# recall@1/@3 against the source entry id, and which path served the query (match_type).
+# Runs start with empty caches (temporary cache dir, semantic cache off); --warm adds a
+# second pass over the same queries so warm-cache numbers are reported separately.
+# The exact/normalized question map is off by default: every "original" query is a KB
+# question verbatim and would never reach retrieval; --question-fast-path measures it.
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+import argparse
+import json
+import random
+import re
+import subprocess
+import tempfile
+import time
+import unicodedata
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.resolve()
+DEFAULT_KB_PATH = BASE_DIR / "data" / "kb.jsonl"
+VARIANTS = ("original", "paraphrase", "asr")
+
+# Rewrites a caller would plausibly use for the same question (applied where they match).
+PARAPHRASES = [
+    (r"^comment\s+", "je voudrais savoir comment "),
+    (r"^quels? (sont|est)\s+", "pouvez-vous me dire \\g<0>"),
+    (r"\bdéclarer\b", "signaler"),
+    (r"\baccéder à\b", "aller sur"),
+    (r"\bmodifier\b", "changer"),
+    (r"\bdélai\b", "combien de temps pour le"),
+    (r"\bréclamation\b", "plainte"),
+    (r"\bcontrat\b", "dossier"),
+    (r"\bretrait\b", "rachat"),
+    (r"^(.*?)\s*\?$", "\\1 s'il vous plaît ?"),
+]
+ASR_HOMOPHONES = {"cnp": "c n p", "amétis": "ametis", "ifu": "i f u", "perco": "per co", "100/100": "cent cent"}
+FILLERS = ["euh", "alors", "en fait", "bah", "voilà"]
+
+
+def load_kb(kb_path: Path) -> List[dict]:
+    with open(kb_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def paraphrase(question: str, rng: random.Random) -> str:
+    """Apply the matching rewrites (at least one when any matches); deterministic for a given rng."""
+    text = question.strip()
+    matching = [(p, r) for p, r in PARAPHRASES if re.search(p, text, flags=re.IGNORECASE)]
+    if not matching:
+        return "je voudrais des informations : " + text
+    chosen = [m for m in matching if rng.random() < 0.6] or [rng.choice(matching)]
+    for pattern, repl in chosen:
+        text = re.sub(pattern, repl, text, count=1, flags=re.IGNORECASE)
+    return text
+
+
+def asr_corrupt(question: str, rng: random.Random) -> str:
+    """Whisper-style transcript: lowercase, no accents/punctuation, homophones, fillers, a dropped word."""
+    words = []
+    for w in re.sub(r"[^\w/'\s-]", " ", question.lower()).split():
+        words.append(ASR_HOMOPHONES.get(w, w))
+    if len(words) > 3 and rng.random() < 0.5:
+        del words[rng.randrange(1, len(words))]
+    if rng.random() < 0.7:
+        words.insert(rng.randrange(0, len(words) + 1), rng.choice(FILLERS))
+    text = " ".join(words)
+    if rng.random() < 0.7:
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return text
+
+
+def make_queries(kb: List[dict], variants: List[str], seed: int = 0) -> Dict[str, List[Tuple[str, str]]]:
+    """{variant: [(query, expected id), ...]} for every KB entry."""
+    rng = random.Random(seed)
+    out = {}
+    for variant in variants:
+        rows = []
+        for item in kb:
+            q = item["question"]
+            if variant == "paraphrase":
+                q = paraphrase(q, rng)
+            elif variant == "asr":
+                q = asr_corrupt(q, rng)
+            rows.append((q, item["id"]))
+        out[variant] = rows
+    return out
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    return {f"p{p}": round(float(np.percentile(samples, p)), 3) for p in (50, 95, 99)}
+
+
+def replay(rag, queries: List[Tuple[str, str]], k: int = 3) -> dict:
+    """Sequential replay: one search_with_metadata per query."""
+    total, embed, search, hits1, hits3, match_types, misses = [], [], [], 0, 0, {}, []
+    start = time.perf_counter()
+    for query, expected in queries:
+        t0 = time.perf_counter()
+        result = rag.search_with_metadata(query, k=k)
+        total.append((time.perf_counter() - t0) * 1000)
+        timings = result.get("timings_ms", {})
+        embed.append(timings.get("embed", 0.0))
+        search.append(timings.get("search", 0.0))
+        ids = [d["id"] for d in result["documents"]]
+        hits1 += ids[:1] == [expected]
+        hits3 += expected in ids[:3]
+        if ids[:1] != [expected]:
+            misses.append({"query": query, "expected": expected, "got": ids})
+        match_type = result.get("match_type", "vector")
+        match_types[match_type] = match_types.get(match_type, 0) + 1
+    wall_s = time.perf_counter() - start
+    n = len(queries)
+    return {
+        "queries": n,
+        "throughput_qps": round(n / wall_s, 1) if wall_s else 0.0,
+        "recall@1": round(hits1 / n, 4) if n else 0.0,
+        "recall@3": round(hits3 / n, 4) if n else 0.0,
+        "latency_ms": {"total": _percentiles(total), "embed": _percentiles(embed), "search": _percentiles(search)},
+        "match_types": match_types,
+        "top1_misses": misses,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_benchmark(rag, kb: List[dict], variants: List[str] = VARIANTS, k: int = 3,
+                  warm: bool = False, seed: int = 0) -> dict:
+    queries = make_queries(kb, variants, seed)
+    stats = rag.get_stats()
+    config = {key: stats[key] for key in ("index_format", "index", "embedding_backend") if key in stats}
+    if "retrieval" in stats:
+        config["retrieval"] = {key: value for key, value in stats["retrieval"].items() if key != "match_types"}
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "kb_entries": len(kb),
+            "k": k,
+            "seed": seed,
+            "rag": config,
+        },
+        "cold": {variant: replay(rag, rows, k) for variant, rows in queries.items()},
+    }
+    if warm:
+        report["warm"] = {variant: replay(rag, rows, k) for variant, rows in queries.items()}
+    return report
+
+
+def print_summary(report: dict) -> None:
+    for phase in ("cold", "warm"):
+        for variant, r in report.get(phase, {}).items():
+            lat = r["latency_ms"]
+            print(f"   {phase:<4} {variant:<10} n={r['queries']:<4} {r['throughput_qps']:>7} q/s  "
+                  f"R@1={r['recall@1']:.3f} R@3={r['recall@3']:.3f}  "
+                  f"p50/p95/p99 total={lat['total']['p50']}/{lat['total']['p95']}/{lat['total']['p99']}ms "
+                  f"embed p50={lat['embed']['p50']}ms search p50={lat['search']['p50']}ms  {r['match_types']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG benchmark: throughput, latency split, recall@1/@3")
+    parser.add_argument("--kb", default=str(DEFAULT_KB_PATH))
+    parser.add_argument("--index", default=None, help="index directory (default RAG/faiss_index)")
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm", action="store_true", help="also replay with warm caches")
+    parser.add_argument("--mode", choices=("hybrid", "vector"), default="vector")
+    parser.add_argument("--backend", default=None, help="embedding backend (torch | onnx-int8)")
+    parser.add_argument("--question-fast-path", action="store_true",
+                        help="answer verbatim KB questions from the question map (original = exact matches)")
+    parser.add_argument("--out", default=None, help="write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    try:  # run as a script from RAG/ or as python -m RAG.bench_rag
+        from rag_api import RAGKnowledgeBase
+    except ImportError:
+        from .rag_api import RAGKnowledgeBase
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-cache-") as cache_dir:
+        rag = RAGKnowledgeBase(index_path=args.index, cache_dir=cache_dir, semantic_cache_size=0,
+                               retrieval_mode=args.mode, embedding_backend=args.backend,
+                               question_fast_path=args.question_fast_path)
+        rag.embeddings.embed_query("warmup")  # model load/first-call cost is not a query latency
+        report = run_benchmark(rag, load_kb(Path(args.kb)), [v for v in args.variants.split(",") if v],
+                               k=args.k, warm=args.warm, seed=args.seed)
+
+    print("\n📊 RAG benchmark")
+    print_summary(report)
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(payload, encoding="utf-8")
+        print(f"💾 Report written to {args.out}")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
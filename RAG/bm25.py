@@ -0,0 +1,128 @@
+"""
+🔤 BM25 INVERTED INDEX
+========================================
+
+Short, keyword-heavy voice queries ("3477", "espace client", policy numbers) are where
+MiniLM similarity is weakest and exact terms are strongest.
+
+- 🏗️  Built by build_index.py next to the FAISS index: faiss_index/bm25.sqlite3
+- 🔍 postings(term -> vector_id, tf) + chunk lengths, queried per term (no full load)
+- ⚡ unambiguous() tells RAGKnowledgeBase when the lexical hit alone is enough
+     and the embedding step can be skipped
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+import math
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+
+BM25_FILE = "bm25.sqlite3"
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Frequent French function words: they match everything and carry no intent.
+STOPWORDS = frozenset("""
+a au aux avec ce ces c d de des du elle en est et il ils j je l la le les leur lui m ma me mes
+moi mon n ne nos notre nous on ou par pas pour qu que qui s sa se ses son sur t ta te tes toi ton
+tu un une vos votre vous y ca cela comment quel quelle quels quelles
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accents folded (ASR drops them), stopwords removed, digits kept."""
+    t = unicodedata.normalize("NFKD", (text or "").lower())
+    t = "".join(c for c in t if not unicodedata.combining(c))
+    return [w for w in _TOKEN.findall(t) if w not in STOPWORDS]
+
+
+def write_bm25_index(path: Path, texts: Union[Dict[int, str], Iterable[Tuple[int, str]]]) -> None:
+    """(Re)write the inverted index atomically from vector id -> chunk text (a dict or streamed pairs)."""
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    db = sqlite3.connect(str(tmp))
+    try:
+        db.execute("CREATE TABLE postings (term TEXT NOT NULL, vector_id INTEGER NOT NULL, tf INTEGER NOT NULL)")
+        db.execute("CREATE TABLE doc_len (vector_id INTEGER PRIMARY KEY, len INTEGER NOT NULL)")
+        db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+        lengths = {}
+        for vid, text in (texts.items() if isinstance(texts, dict) else texts):
+            counts = Counter(tokenize(text))
+            lengths[int(vid)] = sum(counts.values())
+            db.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                           ((term, int(vid), tf) for term, tf in counts.items()))
+        db.executemany("INSERT INTO doc_len VALUES (?, ?)", lengths.items())
+        n = len(lengths)
+        db.executemany("INSERT INTO meta VALUES (?, ?)",
+                       [("n_docs", n), ("avg_len", (sum(lengths.values()) / n) if n else 0.0)])
+        db.execute("CREATE INDEX idx_term ON postings(term)")
+        db.commit()
+    finally:
+        db.close()
+    os.replace(tmp, path)
+
+
+class BM25Index:
+    """Read-only BM25 scorer over bm25.sqlite3."""
+
+    def __init__(self, path: Path, k1: float = 1.2, b: float = 0.75):
+        uri = Path(path).resolve().as_uri() + "?mode=ro"
+        self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.k1 = k1
+        self.b = b
+        meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+        self.n_docs = int(meta.get("n_docs", 0))
+        self.avg_len = float(meta.get("avg_len", 0.0)) or 1.0
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[int, float]]:
+        """Top-k (vector_id, bm25 score), best first."""
+        terms = set(tokenize(query))
+        if not terms or not self.n_docs:
+            return []
+        scores: Dict[int, float] = {}
+        with self._lock:
+            for term in terms:
+                rows = self._db.execute(
+                    "SELECT p.vector_id, p.tf, d.len FROM postings p JOIN doc_len d USING (vector_id) "
+                    "WHERE p.term = ?", (term,)
+                ).fetchall()
+                if not rows:
+                    continue
+                df = len(rows)
+                idf = math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+                for vid, tf, length in rows:
+                    norm = tf + self.k1 * (1.0 - self.b + self.b * length / self.avg_len)
+                    scores[vid] = scores.get(vid, 0.0) + idf * tf * (self.k1 + 1.0) / norm
+        return sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+    @staticmethod
+    def unambiguous(hits: List[Tuple[int, float]], min_score: float = 3.0, margin: float = 1.3) -> bool:
+        """True when the best lexical hit is strong and clearly ahead of the runner-up.
+
+        Calibrated on RAG/data/kb.jsonl (~50 chunks, so one rare term scores ~3.5-4 and shared
+        terms ~1-2): "perco" (single hit, 3.7) and "espace client" (5.8 vs 4.5) pass, while
+        "sinistre" (4.9 vs 4.9) or "clause bénéficiaire" (5.6 vs 5.1) stay on the hybrid path.
+        """
+        if not hits or hits[0][1] < min_score:
+            return False
+        return len(hits) == 1 or hits[0][1] >= margin * hits[1][1]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], weights: List[float], k: int, c: int = 60) -> List[int]:
+    """Fuse several best-first id lists: score(id) = sum(w / (c + rank)). Ties keep the first list's order."""
+    scores: Dict[int, float] = {}
+    first_seen: Dict[int, int] = {}
+    for ranking, w in zip(rankings, weights):
+        for rank, vid in enumerate(ranking, 1):
+            scores[vid] = scores.get(vid, 0.0) + w / (c + rank)
+            first_seen.setdefault(vid, len(first_seen))
+    return sorted(scores, key=lambda vid: (-scores[vid], first_seen[vid]))[:k]
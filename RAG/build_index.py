@@ -1,10 +1,69 @@
+import argparse
+import hashlib
+import itertools
 import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import faiss
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+
+try:  # run as a script from RAG/ or imported as RAG.build_index
+    from mmap_store import (CHUNKS_FILE, INDEX_FILE, MANIFEST_NAME, VERSIONS_DIR, publish_version,
+                            resolve_index_dir, write_chunk_store)
+    from bm25 import BM25_FILE, write_bm25_index
+    from question_index import QUESTIONS_FILE, write_question_index
+    from onnx_embeddings import DEFAULT_EMBEDDING_BACKEND, EMBEDDING_BACKENDS, OnnxEmbeddings
+except ImportError:
+    from .mmap_store import (CHUNKS_FILE, INDEX_FILE, MANIFEST_NAME, VERSIONS_DIR, publish_version,
+                             resolve_index_dir, write_chunk_store)
+    from .bm25 import BM25_FILE, write_bm25_index
+    from .question_index import QUESTIONS_FILE, write_question_index
+    from .onnx_embeddings import DEFAULT_EMBEDDING_BACKEND, EMBEDDING_BACKENDS, OnnxEmbeddings
+
+BASE_DIR = Path(__file__).parent.resolve()
+DEFAULT_KB_PATH = BASE_DIR / "data" / "kb.jsonl"
+DEFAULT_INDEX_DIR = BASE_DIR / "faiss_index"
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+# Changing any of these changes every chunk/vector: the manifest records them and
+# a mismatch forces a full rebuild.
+SPLITTER_PARAMS = {
+    "chunk_size": 1200,
+    "chunk_overlap": 150,
+    "separators": ["\n\n", "\n", " - ", ". ", " "],
+}
+
+# ANN index types. flat = exact (fine up to ~100k chunks); hnsw = graph, fast and
+# accurate but ~1.5x the flat memory; ivfpq = compressed codes (m bytes/vector with
+# nbits=8), needs training on at least 2**nbits and nlist chunks.
+# efSearch / nprobe are search-time settings, re-applied when the index is loaded.
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+KEEP_VERSIONS = 3  # published versions kept on disk (servers may still be draining the previous one)
+DEFAULT_INDEX_PARAMS = {
+    "flat": {},
+    "hnsw": {"M": 32, "efConstruction": 80, "efSearch": 64},
+    "ivfpq": {"nlist": 1024, "m": 48, "nbits": 8, "nprobe": 16},
+}
+IVF_TRAIN_PER_LIST = 64  # ivfpq training sample: the first 64 * nlist chunks (at least 2**nbits)
+
+# Streaming build: entries are chunked CHUNK_BLOCK at a time on a process pool, chunks are
+# embedded DEFAULT_BATCH_SIZE at a time, and the build is checkpointed every
+# DEFAULT_CHECKPOINT_EVERY embedded chunks under <index root>/building/ (resumable).
+STAGING_DIR = "building"
+BUILD_DB = "build.sqlite3"
+CHUNK_BLOCK = 64
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_CHECKPOINT_EVERY = 8192
+
 
 def load_jsonl(path: str):
     with open(path, "r", encoding="utf-8") as f:
@@ -12,30 +71,40 @@ def load_jsonl(path: str):
             if line.strip():
                 yield json.loads(line)
 
-def main():
-    kb_path = "data/kb.jsonl"
-    index_dir = "faiss_index"
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1200,
-        chunk_overlap=150,
-        separators=["\n\n", "\n", " - ", ". ", " "]
-    )
+def entry_key(item: dict) -> str:
+    """Stable identity of a KB entry (its id, or a hash of the question for id-less rows)."""
+    return item.get("id") or "q:" + hashlib.sha1(item.get("question", "").encode("utf-8")).hexdigest()[:16]
+
+
+def entry_hash(item: dict) -> str:
+    """Hash of everything that ends up in the entry's chunks (text + metadata)."""
+    blob = json.dumps({k: item.get(k, "") for k in ("id", "section", "question", "answer", "source_url")},
+                      sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
 
-    docs = []
-    for item in load_jsonl(kb_path):
-        text = f"Question: {item['question']}\n\nRéponse:\n{item['answer']}"
-        chunks = splitter.split_text(text)
-        for i, ch in enumerate(chunks):
-            docs.append(Document(
-                page_content=ch,
-                metadata={
-                    "id": item.get("id", ""),
-                    "section": item.get("section", ""),
-                    "source_url": item.get("source_url", ""),
-                    "chunk_id": i
-                }
-            ))
+
+def chunk_entry(item: dict, splitter) -> list:
+    text = f"Question: {item['question']}\n\nRéponse:\n{item['answer']}"
+    return [
+        Document(
+            page_content=ch,
+            metadata={
+                "id": item.get("id", ""),
+                "section": item.get("section", ""),
+                "source_url": item.get("source_url", ""),
+                "chunk_id": i
+            }
+        )
+        for i, ch in enumerate(splitter.split_text(text))
+    ]
+
+
+def get_embeddings(backend: str = DEFAULT_EMBEDDING_BACKEND):
+    if backend == "onnx-int8":
+        print("⚡ Using the int8 ONNX Runtime backend (CPU)")
+        return OnnxEmbeddings(EMBEDDING_MODEL)
+    from langchain_huggingface import HuggingFaceEmbeddings
 
     # 🚀 Use GPU if available for faster embedding computation
     device = 'cpu'
@@ -50,15 +119,511 @@ def main():
         print("💻 PyTorch not available, using CPU")
 
     # Use local HuggingFace embeddings (multilingual model for French support)
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
         model_kwargs={'device': device},  # Use GPU if available
         encode_kwargs={'normalize_embeddings': True}
     )
-    vs = FAISS.from_documents(docs, embeddings)
-    vs.save_local(index_dir)
 
-    print(f"OK: indexed {len(docs)} chunks -> {index_dir}/")
+
+def index_spec(index_type: str = "flat", **params) -> dict:
+    """{"type": ..., **defaults overridden by params}; None params keep the default."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"index type must be one of {INDEX_TYPES}, got {index_type!r}")
+    spec = {"type": index_type, **DEFAULT_INDEX_PARAMS[index_type]}
+    spec.update({k: v for k, v in params.items() if v is not None and k in DEFAULT_INDEX_PARAMS[index_type]})
+    return spec
+
+
+def make_index(dim: int, spec: dict, train_vectors=None):
+    """Empty index of the requested type, accepting add_with_ids (vector id = our id)."""
+    if spec["type"] == "flat":
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+    if spec["type"] == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(dim, spec["M"])
+        hnsw.hnsw.efConstruction = spec["efConstruction"]
+        hnsw.hnsw.efSearch = spec["efSearch"]
+        return faiss.IndexIDMap2(hnsw)
+
+    # IVF-PQ stores ids itself (no IDMap wrapper) and must be trained first
+    if dim % spec["m"]:
+        raise ValueError(f"ivfpq: m={spec['m']} must divide the embedding dimension {dim}")
+    needed = max(spec["nlist"], 2 ** spec["nbits"])
+    if train_vectors is None or len(train_vectors) < needed:
+        raise ValueError(f"ivfpq: training needs at least {needed} chunks "
+                         f"(nlist={spec['nlist']}, nbits={spec['nbits']}); use a smaller nlist or --index-type flat")
+    index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, spec["nlist"], spec["m"], spec["nbits"])
+    index.train(np.asarray(train_vectors, dtype=np.float32))
+    index.nprobe = spec["nprobe"]
+    return index
+
+
+def remove_vectors(index, spec: dict, vector_ids: list):
+    """Drop vectors by id. HNSW graphs cannot delete: survivors are re-added to a new graph (no re-embedding)."""
+    stale = np.array(vector_ids, dtype=np.int64)
+    if spec["type"] != "hnsw":
+        index.remove_ids(stale)
+        return index
+    keep = np.setdiff1d(faiss.vector_to_array(index.id_map), stale)
+    rebuilt = make_index(index.d, spec)
+    if len(keep):
+        rebuilt.add_with_ids(np.vstack([index.reconstruct(int(i)) for i in keep]), keep)
+    return rebuilt
+
+
+def new_version_name(index_root: Path) -> str:
+    name = time.strftime("v%Y%m%d-%H%M%S")
+    candidate, n = name, 1
+    while (index_root / VERSIONS_DIR / candidate).exists():
+        n += 1
+        candidate = f"{name}-{n}"
+    return candidate
+
+
+def prune_versions(index_root: Path, live: str, keep: int = KEEP_VERSIONS) -> list:
+    """Delete the oldest versions beyond `keep` (never the live one)."""
+    versions = sorted(p for p in (index_root / VERSIONS_DIR).iterdir() if p.is_dir())
+    removed = []
+    for path in versions[:-keep] if keep > 0 else versions:
+        if path.name != live:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(path.name)
+    return removed
+
+
+def load_manifest(index_dir: Path, spec: dict, embedding_backend: str = DEFAULT_EMBEDDING_BACKEND):
+    """Previous manifest + index, or (None, None) when a full build is needed."""
+    manifest_path = index_dir / MANIFEST_NAME
+    if not manifest_path.exists() or not (index_dir / INDEX_FILE).exists():
+        return None, None
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("model") != EMBEDDING_MODEL or manifest.get("splitter") != SPLITTER_PARAMS:
+        print("♻️  Embedding model or chunking changed: full rebuild")
+        return None, None
+    # Backends give close but not identical vectors: never mix them in one index
+    # (manifests written before the backend was recorded were built with torch)
+    if manifest.get("embedding_backend", "torch") != embedding_backend:
+        print(f"♻️  Embedding backend changed -> {embedding_backend}: full rebuild")
+        return None, None
+    if manifest.get("index", {"type": "flat"}) != spec:
+        print(f"♻️  Index type/parameters changed -> {spec}: full rebuild")
+        return None, None
+    index = faiss.read_index(str(index_dir / INDEX_FILE))
+    if not isinstance(index, (faiss.IndexIDMap2, faiss.IndexIVFPQ)):
+        return None, None
+    return manifest, index
+
+
+def scan_kb(kb_path) -> tuple:
+    """
+    Streaming first pass: entry key -> (content hash, position of its last occurrence), and a
+    fingerprint of the whole KB. Only hashes are kept: entries are re-read when chunked.
+    """
+    kb_entries, digest = {}, hashlib.sha256()
+    for position, item in enumerate(load_jsonl(str(kb_path))):
+        key, content_hash = entry_key(item), entry_hash(item)
+        kb_entries[key] = (content_hash, position)
+        digest.update(f"{key}\0{content_hash}\n".encode("utf-8"))
+    return kb_entries, digest.hexdigest()
+
+
+def iter_entries(kb_path, kb_entries: dict, skip: int = 0):
+    """Second pass: (key, item) in file order (a duplicated key keeps its last row), minus the first `skip`."""
+    seen = 0
+    for position, item in enumerate(load_jsonl(str(kb_path))):
+        key = entry_key(item)
+        if kb_entries[key][1] != position:
+            continue
+        seen += 1
+        if seen > skip:
+            yield key, item
+
+
+_worker_splitter = None
+
+
+def _chunk_block(block: list) -> list:
+    """Process-pool task: [(key, item), ...] -> [(key, item, chunks), ...] (one splitter per worker)."""
+    global _worker_splitter
+    if _worker_splitter is None:
+        _worker_splitter = RecursiveCharacterTextSplitter(**SPLITTER_PARAMS)
+    return [(key, item, chunk_entry(item, _worker_splitter)) for key, item in block]
+
+
+def chunk_stream(entries, workers: int = 1, block_size: int = CHUNK_BLOCK):
+    """
+    (key, item, chunks) in input order, chunked by a pool of `workers` processes.
+
+    At most two blocks per worker are in flight, so memory does not grow with the KB.
+    A KB smaller than one block is chunked in-process (no pool start-up cost).
+    """
+    blocks = iter(lambda: list(itertools.islice(entries, block_size)), [])
+    first = next(blocks, None)
+    if first is None:
+        return
+    if workers <= 1 or len(first) < block_size:
+        yield from _chunk_block(first)
+        for block in blocks:
+            yield from _chunk_block(block)
+        return
+
+    # spawn, not fork: the parent may already hold torch / OpenMP threads
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        in_flight = deque([pool.submit(_chunk_block, first)])
+        for block in blocks:
+            in_flight.append(pool.submit(_chunk_block, block))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+class StreamingIndexWriter:
+    """
+    Embeds chunks in fixed-size batches and appends them to the FAISS index as they arrive.
+
+    An IVF-PQ index is created once enough vectors for its training sample are buffered
+    (or at finish() for a smaller KB); flat and HNSW indexes are created on the first batch.
+    """
+
+    def __init__(self, index, spec: dict, embeddings_factory, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.index = index
+        self.spec = spec
+        self.embeddings = None
+        self.batch_size = batch_size
+        self.embedded = 0
+        self._embeddings_factory = embeddings_factory
+        self._pending = []      # (vector id, text) not embedded yet
+        self._untrained = []    # (ids, vectors) batches waiting for the index to be created
+        self._untrained_n = 0
+
+    def add(self, vector_id: int, text: str):
+        self._pending.append((vector_id, text))
+        if len(self._pending) >= self.batch_size:
+            self._embed(self._pending)
+            self._pending = []
+
+    def flush(self):
+        """Embed what is pending (once the index exists, everything is then in it: safe to checkpoint)."""
+        if self._pending:
+            self._embed(self._pending)
+            self._pending = []
+
+    def finish(self):
+        """Flush, create the index from what is buffered if still needed; the index (or None)."""
+        self.flush()
+        if self._untrained:
+            self._create_index()
+        return self.index
+
+    def _train_size(self) -> int:
+        if self.spec["type"] != "ivfpq":
+            return 1
+        return max(2 ** self.spec["nbits"], IVF_TRAIN_PER_LIST * self.spec["nlist"])
+
+    def _embed(self, batch: list):
+        if self.embeddings is None:
+            self.embeddings = self._embeddings_factory()
+        vectors = np.asarray(self.embeddings.embed_documents([text for _, text in batch]), dtype=np.float32)
+        ids = np.array([vid for vid, _ in batch], dtype=np.int64)
+        self.embedded += len(batch)
+        if self.index is not None:
+            self.index.add_with_ids(vectors, ids)
+            return
+        self._untrained.append((ids, vectors))
+        self._untrained_n += len(batch)
+        if self._untrained_n >= self._train_size():
+            self._create_index()
+
+    def _create_index(self):
+        ids = np.concatenate([i for i, _ in self._untrained])
+        vectors = np.vstack([v for _, v in self._untrained])
+        self._untrained, self._untrained_n = [], 0
+        self.index = make_index(vectors.shape[1], self.spec, train_vectors=vectors)
+        self.index.add_with_ids(vectors, ids)
+
+
+class BuildCheckpoint:
+    """
+    Staging area of an in-progress build (<index root>/building/), resumable after an interruption.
+
+    build.sqlite3 holds the entries and chunks written so far and the build state; the FAISS
+    index is saved next to it as index.<generation>.faiss. save() writes the index file first,
+    then commits the transaction naming it: after a crash at any point, the committed rows,
+    state and index file agree. A checkpoint is only resumed by a build with the same
+    fingerprint (KB content, model, chunking, index spec, base version).
+    """
+
+    def __init__(self, index_root: Path, fingerprint: dict):
+        self.dir = Path(index_root) / STAGING_DIR
+        self.db = None
+        self.state = self._resume(fingerprint)
+        if self.state is None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+            self.dir.mkdir(parents=True)
+            self.db = sqlite3.connect(str(self.dir / BUILD_DB))
+            self.db.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, hash TEXT NOT NULL,"
+                            " vector_ids TEXT NOT NULL, question TEXT NOT NULL)")
+            self.db.execute("CREATE TABLE chunks (vector_id INTEGER PRIMARY KEY, content TEXT NOT NULL,"
+                            " id TEXT, section TEXT, source_url TEXT, chunk_id INTEGER)")
+            self.db.execute("CREATE TABLE state (id INTEGER PRIMARY KEY CHECK (id = 0), value TEXT NOT NULL)")
+            self.state = {"fingerprint": fingerprint, "generation": 0, "entries_done": 0,
+                          "next_id": 0, "embedded_chunks": 0}
+            self.db.commit()
+
+    @property
+    def resumed(self) -> bool:
+        return self.state["generation"] > 0
+
+    def _index_path(self, generation: int) -> Path:
+        return self.dir / f"index.{generation}.faiss"
+
+    def _resume(self, fingerprint: dict):
+        if not (self.dir / BUILD_DB).exists():
+            return None
+        db = sqlite3.connect(str(self.dir / BUILD_DB))
+        try:
+            row = db.execute("SELECT value FROM state WHERE id = 0").fetchone()
+        except sqlite3.DatabaseError:
+            row = None
+        state = json.loads(row[0]) if row else None
+        if not state or state["fingerprint"] != fingerprint or not self._index_path(state["generation"]).exists():
+            db.close()
+            return None
+        for path in self.dir.glob("index.*.faiss"):  # written by a save() that never committed
+            if path != self._index_path(state["generation"]):
+                path.unlink()
+        self.db = db
+        return state
+
+    def load_index(self):
+        return faiss.read_index(str(self._index_path(self.state["generation"])))
+
+    def add_entry(self, key: str, content_hash: str, vector_ids: list, question: str):
+        self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                        (key, content_hash, json.dumps(vector_ids), question))
+
+    def add_chunks(self, docs):
+        self.db.executemany(
+            "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?)",
+            ((int(vid), d.page_content, d.metadata.get("id", ""), d.metadata.get("section", ""),
+              d.metadata.get("source_url", ""), int(d.metadata.get("chunk_id", 0))) for vid, d in docs))
+
+    def save(self, index, **state):
+        generation = self.state["generation"] + 1
+        tmp = self.dir / "index.tmp"
+        faiss.write_index(index, str(tmp))
+        os.replace(tmp, self._index_path(generation))
+        self.state.update(state, generation=generation)
+        self.db.execute("INSERT OR REPLACE INTO state VALUES (0, ?)", (json.dumps(self.state),))
+        self.db.commit()
+        previous = self._index_path(generation - 1)
+        if previous.exists():
+            previous.unlink()
+
+    def entries(self):
+        """(key, hash, vector ids, question) in build order."""
+        for key, content_hash, vector_ids, question in self.db.execute(
+                "SELECT key, hash, vector_ids, question FROM entries ORDER BY rowid"):
+            yield key, content_hash, json.loads(vector_ids), question
+
+    def documents(self):
+        """(vector id, Document) by vector id, streamed from disk."""
+        for vid, content, id_, section, source_url, chunk_id in self.db.execute(
+                "SELECT vector_id, content, id, section, source_url, chunk_id FROM chunks ORDER BY vector_id"):
+            yield vid, Document(page_content=content, metadata={
+                "id": id_, "section": section, "source_url": source_url, "chunk_id": chunk_id})
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def discard(self):
+        self.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def build_index(kb_path=DEFAULT_KB_PATH, index_dir=DEFAULT_INDEX_DIR, full: bool = False,
+                embeddings=None, write_pickle: bool = False, index_type: str = "flat",
+                embedding_backend: str = DEFAULT_EMBEDDING_BACKEND, workers: int = None,
+                batch_size: int = DEFAULT_BATCH_SIZE, checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY,
+                **index_params) -> dict:
+    """
+    Incremental, streaming build: only added/edited entries are embedded, deleted ones are removed.
+
+    kb.jsonl is read twice, lazily: a first pass hashes the entries (diff against the manifest),
+    a second one chunks them on `workers` processes (default: all cores), embeds the new chunks
+    in batches of `batch_size` and appends them to the index as it goes. Chunks and entries are
+    staged on disk, not in memory. Every `checkpoint_every` embedded chunks the index and the
+    staged rows are checkpointed under faiss_index/building/: re-running an interrupted build
+    with the same KB and parameters resumes from the last checkpoint (see BuildCheckpoint).
+
+    Each build is written to a new faiss_index/versions/<v>/ directory, then published by
+    replacing faiss_index/CURRENT: running servers hot-reload it (RAGKnowledgeBase.reload),
+    nothing is ever modified in place. A build with no KB change publishes nothing.
+
+    A version holds the pickle-free format (index.faiss + chunks.sqlite3, see mmap_store.py),
+    the BM25 inverted index over the same vector ids (bm25.sqlite3) and the exact/normalized
+    question map (questions.sqlite3, see question_index.py); manifest.json records
+    the build parameters (model, embedding backend, chunking, index type + params) and maps each entry key ->
+    {content hash, vector ids}. index_params override DEFAULT_INDEX_PARAMS[index_type].
+    write_pickle also writes LangChain's index.pkl for tools that call FAISS.load_local (flat only).
+    """
+    start = time.time()
+    index_root = Path(index_dir)
+    previous_dir, previous_version = resolve_index_dir(index_root)
+    spec = index_spec(index_type, **index_params)
+    if write_pickle and spec["type"] != "flat":
+        raise ValueError("index.pkl (LangChain FAISS) is only written for flat indexes")
+    workers = workers or os.cpu_count() or 1
+
+    # 1. Diff the KB against the manifest (hashes only)
+    kb_entries, kb_digest = scan_kb(kb_path)
+    manifest, index = (None, None) if full else load_manifest(previous_dir, spec, embedding_backend)
+    old_entries = manifest["entries"] if manifest else {}
+    unchanged = {k for k, (h, _) in kb_entries.items() if old_entries.get(k, {}).get("hash") == h}
+    removed = [k for k in old_entries if k not in unchanged]
+
+    stats = {
+        "index": spec,
+        "entries": len(kb_entries),
+        "reused_entries": len(unchanged),
+        "added_or_edited_entries": len(kb_entries) - len(unchanged),
+        "deleted_entries": len([k for k in old_entries if k not in kb_entries]),
+    }
+    side_files = all((previous_dir / name).exists() for name in (BM25_FILE, QUESTIONS_FILE))
+    if manifest is not None and previous_version and len(unchanged) == len(kb_entries) and not removed \
+            and not write_pickle and side_files:
+        return {**stats, "chunks": index.ntotal, "embedded_chunks": 0, "version": previous_version,
+                "published": False, "seconds": round(time.time() - start, 2)}
+
+    # 2. Resume an interrupted build of this exact KB/configuration, or start from the previous
+    #    index minus the vectors of deleted and edited entries
+    checkpoint = BuildCheckpoint(index_root, {
+        "kb": kb_digest, "model": EMBEDDING_MODEL, "embedding_backend": embedding_backend,
+        "splitter": SPLITTER_PARAMS, "index": spec, "base_version": previous_version, "full": full,
+    })
+    state, resumed = checkpoint.state, checkpoint.resumed
+    if resumed:
+        index = checkpoint.load_index()
+        print(f"⏯️  Resuming interrupted build: {state['entries_done']}/{len(kb_entries)} entries already indexed")
+    else:
+        state["next_id"] = manifest["next_id"] if manifest else 0
+        if index is not None and removed:
+            stale = [vid for k in removed for vid in old_entries[k]["vector_ids"]]
+            index = remove_vectors(index, spec, stale)
+
+    try:
+        # 3. Chunk every entry (process pool), embed only the new/edited chunks, checkpoint regularly
+        writer = StreamingIndexWriter(index, spec, lambda: embeddings or get_embeddings(embedding_backend), batch_size)
+        next_id, entries_done, since_checkpoint = state["next_id"], state["entries_done"], 0
+        embedded_before = state["embedded_chunks"]
+        for key, item, chunks in chunk_stream(iter_entries(kb_path, kb_entries, skip=entries_done), workers):
+            if key in unchanged:
+                vector_ids = old_entries[key]["vector_ids"]
+            else:
+                vector_ids = list(range(next_id, next_id + len(chunks)))
+                next_id += len(chunks)
+                for vid, doc in zip(vector_ids, chunks):
+                    writer.add(vid, doc.page_content)
+                since_checkpoint += len(chunks)
+            checkpoint.add_entry(key, kb_entries[key][0], vector_ids, item.get("question", ""))
+            checkpoint.add_chunks(zip(vector_ids, chunks))
+            entries_done += 1
+            if since_checkpoint >= checkpoint_every and writer.index is not None:  # ivfpq: trained
+                writer.flush()
+                checkpoint.save(writer.index, entries_done=entries_done, next_id=next_id,
+                                embedded_chunks=embedded_before + writer.embedded)
+                since_checkpoint = 0
+                print(f"   ⏳ {entries_done}/{len(kb_entries)} entries, {embedded_before + writer.embedded} chunks embedded "
+                      f"({time.time() - start:.0f}s)")
+        index = writer.finish()
+        if index is None:
+            raise ValueError(f"No entries to index in {kb_path}")
+        embedded_chunks = embedded_before + writer.embedded
+        if entries_done != state["entries_done"]:  # a crash while writing the version resumes from here
+            checkpoint.save(index, entries_done=entries_done, next_id=next_id, embedded_chunks=embedded_chunks)
+        stats.update(chunks=index.ntotal, embedded_chunks=embedded_chunks)
+
+        # 4. Save into a fresh version: raw index + chunk store (no pickle), BM25, question map,
+        #    optional LangChain pickle, manifest; then publish it. Rows stream from the staging store.
+        version = new_version_name(index_root)
+        index_dir = index_root / VERSIONS_DIR / version
+        index_dir.mkdir(parents=True)
+        faiss.write_index(index, str(index_dir / INDEX_FILE))
+        write_chunk_store(index_dir / CHUNKS_FILE, checkpoint.documents())
+        write_bm25_index(index_dir / BM25_FILE, ((vid, d.page_content) for vid, d in checkpoint.documents()))
+        write_question_index(index_dir / QUESTIONS_FILE,
+                             ((question, vector_ids) for _, _, vector_ids, question in checkpoint.entries()))
+        if write_pickle:
+            from langchain_community.docstore.in_memory import InMemoryDocstore
+            from langchain_community.vectorstores import FAISS
+
+            docs = dict(checkpoint.documents())
+            docstore_ids = {vid: str(vid) for vid in docs}
+            FAISS(
+                embedding_function=writer.embeddings or embeddings,
+                index=index,
+                docstore=InMemoryDocstore({docstore_ids[vid]: d for vid, d in docs.items()}),
+                index_to_docstore_id=docstore_ids,
+            ).save_local(str(index_dir))
+        (index_dir / MANIFEST_NAME).write_text(json.dumps({
+            "model": EMBEDDING_MODEL,
+            "embedding_backend": embedding_backend,
+            "splitter": SPLITTER_PARAMS,
+            "index": spec,
+            "next_id": next_id,
+            "entries": {key: {"hash": content_hash, "vector_ids": vector_ids}
+                        for key, content_hash, vector_ids, _ in checkpoint.entries()},
+        }, ensure_ascii=False, indent=1), encoding="utf-8")
+        publish_version(index_root, version)
+        checkpoint.discard()
+        pruned = prune_versions(index_root, version)
+    except BaseException:
+        checkpoint.close()  # uncommitted rows roll back: the last checkpoint stays resumable
+        raise
+
+    return {**stats, "version": version, "published": True, "resumed": resumed,
+            "pruned_versions": pruned, "seconds": round(time.time() - start, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build (incrementally) the RAG FAISS index from kb.jsonl")
+    parser.add_argument("--kb", default=str(DEFAULT_KB_PATH))
+    parser.add_argument("--out", default=str(DEFAULT_INDEX_DIR))
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and re-embed everything")
+    parser.add_argument("--pickle", action="store_true",
+                        help="also write LangChain's index.pkl (FAISS.load_local compatibility)")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--workers", type=int, default=None, help="chunking processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="chunks per embedding call")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                        help="embedded chunks between checkpoints (an interrupted build resumes from the last one)")
+    parser.add_argument("--embedding-backend", choices=EMBEDDING_BACKENDS, default=DEFAULT_EMBEDDING_BACKEND,
+                        help="torch (HuggingFace) or onnx-int8 (ONNX Runtime, see onnx_embeddings.py)")
+    parser.add_argument("--hnsw-m", type=int, dest="M", help="hnsw: graph neighbours per node (default 32)")
+    parser.add_argument("--ef-construction", type=int, dest="efConstruction", help="hnsw: build beam (default 80)")
+    parser.add_argument("--ef-search", type=int, dest="efSearch", help="hnsw: search beam (default 64)")
+    parser.add_argument("--nlist", type=int, help="ivfpq: inverted lists (default 1024)")
+    parser.add_argument("--m", type=int, help="ivfpq: PQ sub-quantizers, must divide 384 (default 48)")
+    parser.add_argument("--nbits", type=int, help="ivfpq: bits per sub-quantizer (default 8)")
+    parser.add_argument("--nprobe", type=int, help="ivfpq: lists visited per query (default 16)")
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ("M", "efConstruction", "efSearch", "nlist", "m", "nbits", "nprobe")}
+    stats = build_index(args.kb, args.out, full=args.full, write_pickle=args.pickle,
+                        index_type=args.index_type, embedding_backend=args.embedding_backend,
+                        workers=args.workers, batch_size=args.batch_size, checkpoint_every=args.checkpoint_every,
+                        **params)
+    if not stats["published"]:
+        print(f"OK: KB unchanged, {args.out}/ stays on version {stats['version']}")
+        return
+    print(f"OK: indexed {stats['chunks']} chunks ({stats['index']}) -> {args.out}/ version {stats['version']}")
+    print(f"   ♻️  reused {stats['reused_entries']} entries, "
+          f"embedded {stats['embedded_chunks']} chunks "
+          f"({stats['added_or_edited_entries']} added/edited, {stats['deleted_entries']} deleted) "
+          f"in {stats['seconds']}s{' (resumed)' if stats['resumed'] else ''}")
 
 if __name__ == "__main__":
     main()
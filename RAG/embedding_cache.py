@@ -0,0 +1,176 @@
+"""
+💾 QUERY EMBEDDING CACHE
+========================================
+
+Two tiers, both keyed by (model name, normalized query):
+- ⚡ Memory: LRU of float32 vectors (hot questions, no I/O)
+- 💽 Disk:   SQLite file in embedding_cache/ (survives restarts, size-bounded)
+
+A hit in either tier skips the transformer forward pass entirely.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+_SPACES = re.compile(r"\s+")
+_PUNCT = re.compile(r"[^\w\s'-]")
+
+
+def normalize_query(query: str) -> str:
+    """Same question, same key: NFC, lowercase, punctuation and extra spaces removed."""
+    q = unicodedata.normalize("NFC", query or "").lower()
+    q = _PUNCT.sub(" ", q)
+    return _SPACES.sub(" ", q).strip()
+
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU in front of an on-disk SQLite store.
+
+    Eviction:
+    - memory: least recently used beyond max_memory entries
+    - disk:   least recently used beyond max_disk entries (checked every 1/8 of max_disk inserts)
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str,
+                 max_memory: int = 2048, max_disk: int = 100_000):
+        self.model_name = model_name
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inserts_since_trim = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                      "memory_evictions": 0, "disk_evictions": 0}
+
+        self.path = Path(cache_dir) / "query_embeddings.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS query_embeddings ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, query TEXT NOT NULL,"
+            " vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON query_embeddings(last_used)")
+        self._db.commit()
+
+    def key(self, query: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\x00{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    # ----- memory tier -----
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+            self.stats["memory_evictions"] += 1
+
+    # ----- public API -----
+
+    def get(self, query: str) -> Tuple[Optional[np.ndarray], str]:
+        """(vector, tier) with tier in "memory" | "disk" | "miss"."""
+        key = self.key(query)
+        with self._lock:
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return vec, "memory"
+
+            row = self._db.execute(
+                "SELECT vector FROM query_embeddings WHERE key = ? AND model = ?", (key, self.model_name)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None, "miss"
+
+            vec = np.frombuffer(row[0], dtype=np.float32)
+            self._db.execute("UPDATE query_embeddings SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self._remember(key, vec)
+            self.stats["disk_hits"] += 1
+            return vec, "disk"
+
+    def put(self, query: str, vector) -> np.ndarray:
+        key = self.key(query)
+        vec = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vec)
+            self._db.execute(
+                "INSERT OR REPLACE INTO query_embeddings (key, model, query, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, self.model_name, normalize_query(query), vec.tobytes(), time.time()),
+            )
+            self._inserts_since_trim += 1
+            if self._inserts_since_trim >= max(1, self.max_disk // 8):
+                self._trim_disk()
+            self._db.commit()
+        return vec
+
+    def get_or_compute(self, query: str, embed: Callable[[str], list]) -> Tuple[np.ndarray, bool]:
+        """(vector, cached): embed(query) only runs on a miss in both tiers."""
+        vec, tier = self.get(query)
+        if vec is not None:
+            return vec, True
+        return self.put(query, embed(query)), False
+
+    def get_or_compute_many(self, queries: List[str],
+                            embed_many: Callable[[List[str]], list]) -> Tuple[np.ndarray, List[bool]]:
+        """(matrix, cached flags): all misses are embedded by ONE embed_many call (one forward pass)."""
+        vectors: List[Optional[np.ndarray]] = []
+        missing: Dict[str, List[int]] = {}
+        for i, q in enumerate(queries):
+            vec, _ = self.get(q)
+            vectors.append(vec)
+            if vec is None:
+                missing.setdefault(normalize_query(q), []).append(i)
+        cached = [v is not None for v in vectors]
+        if missing:
+            firsts = [queries[rows[0]] for rows in missing.values()]
+            for q, rows, vec in zip(firsts, missing.values(), embed_many(firsts)):
+                vec = self.put(q, vec)
+                for i in rows:
+                    vectors[i] = vec
+        return np.vstack(vectors).astype(np.float32), cached
+
+    def _trim_disk(self) -> None:
+        self._inserts_since_trim = 0
+        (count,) = self._db.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()
+        extra = count - self.max_disk
+        if extra > 0:
+            self._db.execute(
+                "DELETE FROM query_embeddings WHERE key IN "
+                "(SELECT key FROM query_embeddings ORDER BY last_used ASC LIMIT ?)", (extra,)
+            )
+            self.stats["disk_evictions"] += extra
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM query_embeddings")
+            self._db.commit()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            (disk_size,) = self._db.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "memory_size": len(self._memory),
+                "max_memory": self.max_memory,
+                "disk_size": disk_size,
+                "max_disk": self.max_disk,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "path": str(self.path),
+            }
@@ -0,0 +1,166 @@
+"""
+🗂️ PICKLE-FREE INDEX FORMAT
+========================================
+
+faiss_index/
+- CURRENT          name of the live version (replaced atomically by build_index.py)
+- versions/<v>/    one complete, immutable index per build:
+  - index.faiss      raw FAISS index, opened memory-mapped (pages shared by every worker process)
+  - chunks.sqlite3   chunk text + metadata, keyed by FAISS vector id (read-only at query time)
+  - bm25.sqlite3     BM25 inverted index over the same vector ids (see bm25.py)
+  - questions.sqlite3 exact / normalized KB question -> vector ids (see question_index.py)
+  - manifest.json    build parameters, including the index type (flat / hnsw / ivfpq) and its
+                     search-time settings (efSearch, nprobe) applied on load
+- building/        checkpoints of an in-progress build (build_index.py), removed once published
+
+No pickle anywhere: loading is an mmap + a SQLite open, near-instant whatever the KB size.
+A directory without CURRENT is read as a single unversioned index (older builds).
+Written by build_index.py, read by RAGKnowledgeBase (falls back to index.pkl for old indexes).
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import json
+import os
+import sqlite3
+import threading
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.sqlite3"
+MANIFEST_NAME = "manifest.json"
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def current_version(index_root: Path) -> Optional[str]:
+    """Live version name, or None for an unversioned directory."""
+    path = Path(index_root) / CURRENT_FILE
+    if not path.exists():
+        return None
+    return path.read_text(encoding="utf-8").strip() or None
+
+
+def resolve_index_dir(index_root: Path) -> Tuple[Path, Optional[str]]:
+    """(directory holding the live index files, version name or None)."""
+    version = current_version(index_root)
+    if version is None:
+        return Path(index_root), None
+    return Path(index_root) / VERSIONS_DIR / version, version
+
+
+def publish_version(index_root: Path, version: str) -> None:
+    """Point CURRENT at a fully written version (atomic: readers see the old or the new name)."""
+    path = Path(index_root) / CURRENT_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(version + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_index_mmap(path: Path):
+    """Open a FAISS index with its vectors memory-mapped (flat codes); plain read if unsupported."""
+    flags = getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+    try:
+        return faiss.read_index(str(path), flags)
+    except RuntimeError:
+        return faiss.read_index(str(path))
+
+
+def read_index_spec(index_dir: Path) -> dict:
+    """{"type": ..., **params} recorded by build_index.py ({"type": "flat"} for older indexes)."""
+    path = Path(index_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {"type": "flat"}
+    return json.loads(path.read_text(encoding="utf-8")).get("index", {"type": "flat"})
+
+
+def apply_search_params(index, spec: dict) -> None:
+    """Search-time knobs are not all serialized by FAISS: set them from the build spec."""
+    if spec.get("type") == "hnsw" and "efSearch" in spec:
+        base = index.index if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)) else index
+        faiss.downcast_index(base).hnsw.efSearch = int(spec["efSearch"])
+    elif spec.get("type") == "ivfpq" and "nprobe" in spec:
+        faiss.extract_index_ivf(index).nprobe = int(spec["nprobe"])
+
+
+def write_chunk_store(path: Path, docs: Union[Dict[int, Document], Iterable[Tuple[int, Document]]]) -> None:
+    """(Re)write chunks.sqlite3 atomically: vector id -> content + metadata (a dict or streamed pairs)."""
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    db = sqlite3.connect(str(tmp))
+    try:
+        db.execute(
+            "CREATE TABLE chunks (vector_id INTEGER PRIMARY KEY, content TEXT NOT NULL,"
+            " id TEXT, section TEXT, source_url TEXT, chunk_id INTEGER)"
+        )
+        db.executemany(
+            "INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?)",
+            ((int(vid), d.page_content, d.metadata.get("id", ""), d.metadata.get("section", ""),
+              d.metadata.get("source_url", ""), int(d.metadata.get("chunk_id", 0)))
+             for vid, d in (docs.items() if isinstance(docs, dict) else docs)),
+        )
+        db.commit()
+    finally:
+        db.close()
+    os.replace(tmp, path)
+
+
+def has_mmap_format(index_dir: Path) -> bool:
+    index_dir = Path(index_dir)
+    return (index_dir / INDEX_FILE).exists() and (index_dir / CHUNKS_FILE).exists()
+
+
+class MmapVectorStore:
+    """
+    Read-only vector store over the pickle-free format.
+
+    Same search methods RAGKnowledgeBase uses on LangChain's FAISS
+    (L2 distances, -1 padding skipped), plus search_matrix for batches.
+    """
+
+    def __init__(self, index_dir: Path):
+        index_dir = Path(index_dir)
+        self.index = read_index_mmap(index_dir / INDEX_FILE)
+        self.index_spec = read_index_spec(index_dir)
+        apply_search_params(self.index, self.index_spec)
+        uri = (index_dir / CHUNKS_FILE).resolve().as_uri() + "?mode=ro"
+        self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def documents(self, vector_ids: Iterable[int]) -> Dict[int, Document]:
+        ids = sorted({int(i) for i in vector_ids})
+        if not ids:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT vector_id, content, id, section, source_url, chunk_id FROM chunks "
+                f"WHERE vector_id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        return {
+            vid: Document(page_content=content, metadata={
+                "id": id_, "section": section, "source_url": source_url, "chunk_id": chunk_id})
+            for vid, content, id_, section, source_url, chunk_id in rows
+        }
+
+    def search_matrix(self, vectors, k: int) -> List[List[Tuple[Document, float]]]:
+        """One index.search over stacked query vectors -> [(Document, distance), ...] per query."""
+        distances, indices = self.index.search(np.array(vectors, dtype=np.float32).reshape(-1, self.index.d), k)
+        docs = self.documents(i for row in indices for i in row if i != -1)
+        return [
+            [(docs[int(i)], dist) for dist, i in zip(row_d, row_i) if i != -1 and int(i) in docs]
+            for row_d, row_i in zip(distances, indices)
+        ]
+
+    def similarity_search_with_score_by_vector(self, embedding: Sequence[float], k: int = 4):
+        return self.search_matrix([embedding], k)[0]
+
+    def similarity_search_by_vector(self, embedding: Sequence[float], k: int = 4):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k)]
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,185 @@
+"""
+⚡ ONNX INT8 EMBEDDINGS
+========================================
+
+CPU-only servers spend most of a search encoding the query through PyTorch.
+This backend serves the same MiniLM model with ONNX Runtime, int8-quantized:
+
+- 📦 Exported once: AutoModel -> model.onnx -> model.int8.onnx (dynamic quantization,
+     int8 weights, activations quantized on the fly), cached in RAG/onnx_model/
+- 🧮 Same pooling as sentence-transformers: mean over the attention mask + L2 normalization
+- 🪶 Serving needs onnxruntime + tokenizers only: torch/transformers are never imported
+- 🎯 parity_check() compares cosine similarities with the torch model before you switch
+
+Select with CALLBOT_EMBEDDING_BACKEND=onnx-int8 (default: torch).
+Needs: pip install onnx onnxruntime
+"""
+
+from pathlib import Path
+from typing import List, Optional
+import json
+import os
+import re
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+BASE_DIR = Path(__file__).parent.resolve()
+DEFAULT_ONNX_DIR = BASE_DIR / "onnx_model"
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDING_BACKENDS = ("torch", "onnx-int8")
+DEFAULT_EMBEDDING_BACKEND = os.getenv("CALLBOT_EMBEDDING_BACKEND", "torch")
+MAX_SEQ_LENGTH = 128  # sentence-transformers' max_seq_length for this model
+
+PARITY_SENTENCES = [
+    "Comment déclarer un sinistre ?",
+    "comment accéder à mon espace client",
+    "où en est mon dossier numéro 3477",
+    "je veux faire une réclamation, c'est inadmissible",
+    "Quelles sont les garanties de mon contrat prévoyance ?",
+    "mon mari est à l'hôpital, c'est urgent",
+]
+
+
+def _model_dir(model_name: str, onnx_dir: Path) -> Path:
+    return Path(onnx_dir) / re.sub(r"[^\w.-]+", "__", model_name.strip("/"))
+
+
+def export_quantized(model_name: str = EMBEDDING_MODEL, onnx_dir: Path = DEFAULT_ONNX_DIR,
+                     cache_folder: Optional[str] = None) -> Path:
+    """Path of model.int8.onnx, exporting + quantizing it the first time (tokenizer saved alongside)."""
+    out_dir = _model_dir(model_name, onnx_dir)
+    quantized = out_dir / "model.int8.onnx"
+    if quantized.exists():
+        return quantized
+
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    print(f"📦 Exporting {model_name} to ONNX (one-time)...")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=cache_folder)
+    model = AutoModel.from_pretrained(model_name, cache_dir=cache_folder).eval()
+    tokenizer.save_pretrained(str(out_dir))
+
+    class Encoder(torch.nn.Module):
+        """Keyword call + last_hidden_state only: stable across transformers versions."""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    sample = tokenizer(["export"], return_tensors="pt")
+    fp32 = out_dir / "model.onnx"
+    axes = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            Encoder(model), (sample["input_ids"], sample["attention_mask"]), str(fp32),
+            input_names=["input_ids", "attention_mask"], output_names=["last_hidden_state"],
+            dynamic_axes={"input_ids": axes, "attention_mask": axes, "last_hidden_state": axes},
+            opset_version=17, dynamo=False,
+        )
+
+    print("🗜️  Quantizing weights to int8...")
+    tmp = out_dir / "model.int8.onnx.tmp"
+    quantize_dynamic(str(fp32), str(tmp), weight_type=QuantType.QInt8)
+    os.replace(tmp, quantized)
+    return quantized
+
+
+class OnnxEmbeddings(Embeddings):
+    """LangChain Embeddings over the int8 ONNX export (drop-in for HuggingFaceEmbeddings, normalized)."""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, onnx_dir: Path = DEFAULT_ONNX_DIR,
+                 cache_folder: Optional[str] = None, threads: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.model_path = export_quantized(model_name, onnx_dir, cache_folder)
+        model_dir = self.model_path.parent
+        config = json.loads((model_dir / "tokenizer_config.json").read_text(encoding="utf-8"))
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        pad_token = config.get("pad_token") or "<pad>"
+        if isinstance(pad_token, dict):  # older tokenizer_config.json: AddedToken as a dict
+            pad_token = pad_token["content"]
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0, pad_token=pad_token)
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(self.model_path), options, providers=["CPUExecutionProvider"])
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(list(texts))
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        (hidden,) = self.session.run(["last_hidden_state"], {"input_ids": ids, "attention_mask": mask})
+        weights = mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(texts).tolist() if texts else []
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+
+def make_embeddings(backend: str = DEFAULT_EMBEDDING_BACKEND, model_name: str = EMBEDDING_MODEL,
+                    device: str = "cpu", cache_folder: Optional[str] = None) -> Embeddings:
+    """Embeddings for the selected backend ("torch" = HuggingFaceEmbeddings, "onnx-int8" = OnnxEmbeddings)."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"embedding backend must be one of {EMBEDDING_BACKENDS}, got {backend!r}")
+    if backend == "onnx-int8":
+        return OnnxEmbeddings(model_name, cache_folder=cache_folder)
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    kwargs = {"cache_folder": cache_folder} if cache_folder else {}
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={'device': device},
+        encode_kwargs={'normalize_embeddings': True},
+        **kwargs
+    )
+
+
+def parity_check(reference: Embeddings, candidate: Embeddings, sentences: List[str] = PARITY_SENTENCES,
+                 min_cosine: float = 0.99) -> dict:
+    """
+    Cosine(reference, candidate) per sentence, plus agreement of the pairwise similarity
+    matrices (what retrieval actually ranks on).
+    """
+    ref = np.asarray(reference.embed_documents(sentences), dtype=np.float32)
+    cand = np.asarray(candidate.embed_documents(sentences), dtype=np.float32)
+    ref /= np.linalg.norm(ref, axis=1, keepdims=True)
+    cand /= np.linalg.norm(cand, axis=1, keepdims=True)
+    cosines = (ref * cand).sum(axis=1)
+    sim_gap = np.abs(ref @ ref.T - cand @ cand.T).max()
+    return {
+        "min_cosine": round(float(cosines.min()), 4),
+        "mean_cosine": round(float(cosines.mean()), 4),
+        "max_similarity_gap": round(float(sim_gap), 4),
+        "passed": bool(cosines.min() >= min_cosine),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Export the int8 ONNX embedding model and check parity with torch")
+    parser.add_argument("--model", default=EMBEDDING_MODEL)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    args = parser.parse_args()
+
+    report = parity_check(make_embeddings("torch", args.model), make_embeddings("onnx-int8", args.model),
+                          min_cosine=args.min_cosine)
+    print(json.dumps(report, indent=2))
+    print("✅ parity OK" if report["passed"] else "❌ parity FAILED: keep the torch backend")
+    raise SystemExit(0 if report["passed"] else 1)
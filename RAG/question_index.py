@@ -0,0 +1,92 @@
+"""
+🎯 QUESTION INDEX (EXACT / NORMALIZED MATCH)
+========================================
+
+Many calls are a KB question said (almost) word for word, or a fixed phrase:
+"Bonjour", "Bonsoir". Those need neither the transformer nor FAISS.
+
+- 🏗️  Built by build_index.py next to the FAISS index: faiss_index/.../questions.sqlite3
+- 🔑 Two keys per KB question -> the entry's vector ids (chunk order):
+     exact      the question as written (trimmed)
+     normalized lowercase, accents folded, punctuation and extra spaces removed
+- ⚡ lookup() is one primary-key read: RAGKnowledgeBase answers from it before BM25/FAISS
+- 🚫 A key shared by two different entries is dropped (no fast path for an ambiguous phrase)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+import unicodedata
+
+try:  # imported as RAG.question_index or with RAG/ on sys.path
+    from .embedding_cache import normalize_query
+except ImportError:
+    from embedding_cache import normalize_query
+
+QUESTIONS_FILE = "questions.sqlite3"
+MATCH_KINDS = ("exact", "normalized")
+
+
+def exact_key(text: str) -> str:
+    return unicodedata.normalize("NFC", text or "").strip()
+
+
+def normalized_key(text: str) -> str:
+    """normalize_query + accents folded (ASR transcripts often drop them)."""
+    t = unicodedata.normalize("NFKD", normalize_query(text))
+    return "".join(c for c in t if not unicodedata.combining(c))
+
+
+def write_question_index(path: Path, questions: Iterable[Tuple[str, List[int]]]) -> None:
+    """(Re)write the question map atomically from (question, vector ids of its entry) pairs."""
+    keys: Dict[Tuple[str, str], Optional[List[int]]] = {}
+    for question, vector_ids in questions:
+        vector_ids = [int(v) for v in vector_ids]
+        for kind, key in (("exact", exact_key(question)), ("normalized", normalized_key(question))):
+            if not key:
+                continue
+            seen = keys.setdefault((kind, key), vector_ids)
+            if seen is not None and seen != vector_ids:
+                keys[(kind, key)] = None  # ambiguous
+
+    path = Path(path)
+    tmp = path.with_suffix(".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    db = sqlite3.connect(str(tmp))
+    try:
+        db.execute("CREATE TABLE questions (kind TEXT NOT NULL, key TEXT NOT NULL, vector_ids TEXT NOT NULL,"
+                   " PRIMARY KEY (kind, key)) WITHOUT ROWID")
+        db.executemany("INSERT INTO questions VALUES (?, ?, ?)",
+                       ((kind, key, json.dumps(ids)) for (kind, key), ids in keys.items() if ids is not None))
+        db.commit()
+    finally:
+        db.close()
+    os.replace(tmp, path)
+
+
+class QuestionIndex:
+    """Read-only exact/normalized question lookup over questions.sqlite3."""
+
+    def __init__(self, path: Path):
+        uri = Path(path).resolve().as_uri() + "?mode=ro"
+        self._db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def lookup(self, query: str) -> Optional[Tuple[str, List[int]]]:
+        """(match kind, vector ids) for a KB question, exact key first; None otherwise."""
+        for kind, key in (("exact", exact_key(query)), ("normalized", normalized_key(query))):
+            if not key:
+                continue
+            with self._lock:
+                row = self._db.execute("SELECT vector_ids FROM questions WHERE kind = ? AND key = ?",
+                                       (kind, key)).fetchone()
+            if row:
+                return kind, json.loads(row[0])
+        return None
+
+    def close(self) -> None:
+        self._db.close()
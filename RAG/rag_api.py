@@ -32,17 +32,82 @@ os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
-# Caching imports - commented out due to LangChain version compatibility
-# from langchain.embeddings.cache import CacheBackedEmbeddings
-# from langchain.storage import LocalFileStore
+import functools
 import json
+import operator
+import threading
 import time
+from contextlib import contextmanager
 from pathlib import Path
 
+try:  # imported as RAG.rag_api or with RAG/ on sys.path (tool_router orchestrator)
+    from .embedding_cache import QueryEmbeddingCache
+    from .semantic_cache import SemanticAnswerCache
+    from .mmap_store import MmapVectorStore, current_version, has_mmap_format, resolve_index_dir
+    from .bm25 import BM25_FILE, BM25Index, reciprocal_rank_fusion
+    from .question_index import QUESTIONS_FILE, QuestionIndex
+    from .onnx_embeddings import DEFAULT_EMBEDDING_BACKEND, EMBEDDING_BACKENDS, OnnxEmbeddings
+except ImportError:
+    from embedding_cache import QueryEmbeddingCache
+    from semantic_cache import SemanticAnswerCache
+    from mmap_store import MmapVectorStore, current_version, has_mmap_format, resolve_index_dir
+    from bm25 import BM25_FILE, BM25Index, reciprocal_rank_fusion
+    from question_index import QUESTIONS_FILE, QuestionIndex
+    from onnx_embeddings import DEFAULT_EMBEDDING_BACKEND, EMBEDDING_BACKENDS, OnnxEmbeddings
+
 # Get the directory where THIS file (rag_api.py) is located
 BASE_DIR = Path(__file__).parent.resolve()
 DEFAULT_CACHE_DIR = BASE_DIR / "embedding_cache"
 DEFAULT_INDEX_PATH = BASE_DIR / "faiss_index"
+EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+RETRIEVAL_MODES = ("vector", "hybrid")
+# FAISS-only ranking unless a deployment opts into BM25 fusion (changes result order)
+DEFAULT_RETRIEVAL_MODE = os.getenv("CALLBOT_RAG_RETRIEVAL_MODE", "vector")
+DEFAULT_WATCH_INTERVAL_S = float(os.getenv("CALLBOT_RAG_WATCH_S", "0"))  # 0 = no watcher
+DRAIN_TIMEOUT_S = 30.0
+
+
+class _IndexVersion:
+    """One loaded index version. Searches pin it, so a hot swap never mixes two versions."""
+
+    def __init__(self, name, path, vectorstore, index_format, bm25, questions):
+        self.name = name
+        self.path = path
+        self.vectorstore = vectorstore
+        self.index_format = index_format
+        self.bm25 = bm25
+        self.questions = questions
+        self.in_flight = 0
+        self._idle = threading.Condition()
+
+    def acquire(self):
+        with self._idle:
+            self.in_flight += 1
+
+    def release(self):
+        with self._idle:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.notify_all()
+
+    def drain_and_close(self, timeout: float = DRAIN_TIMEOUT_S) -> bool:
+        """Wait for in-flight searches to finish, then release file handles. False on timeout."""
+        with self._idle:
+            drained = self._idle.wait_for(lambda: self.in_flight == 0, timeout)
+        if drained:
+            for resource in (self.vectorstore, self.bm25, self.questions):
+                if hasattr(resource, "close"):
+                    resource.close()
+        return drained
+
+
+def _pins_index(method):
+    """Run a public search method against one index version from start to finish."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._pinned():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class RAGKnowledgeBase:
@@ -54,14 +119,45 @@ class RAGKnowledgeBase:
     🔒 Security: All data stays on your infrastructure
     """
     
-    def __init__(self, index_path=None, cache_dir=None):
+    def __init__(self, index_path=None, cache_dir=None, memory_cache_size=2048, disk_cache_size=100_000,
+                 semantic_cache_size=512, semantic_threshold=0.95, semantic_audit_rate=0.05,
+                 retrieval_mode=None, lexical_fast_path=True, question_fast_path=True, embedding_backend=None,
+                 watch_interval_s=None):
         """
         Initialize FAISS index and embeddings WITH CACHING
         
         Args:
             index_path: Path to FAISS index (default: RAG/faiss_index/)
             cache_dir: Directory for caching embeddings (default: RAG/embedding_cache/)
+            memory_cache_size: Query embeddings kept in the in-memory LRU
+            disk_cache_size: Query embeddings kept on disk (oldest evicted first)
+            semantic_cache_size: Recent result sets reusable by near-duplicate questions (0 = off)
+            semantic_threshold: Cosine similarity above which a previous result set is reused
+            semantic_audit_rate: Fraction of semantic hits re-checked against the real search
+            retrieval_mode: "vector" (FAISS only) or "hybrid" (FAISS + BM25 fused); default
+                            CALLBOT_RAG_RETRIEVAL_MODE, else "vector". Hybrid needs bm25.sqlite3
+                            next to a pickle-free index, else vector is used
+            lexical_fast_path: In hybrid mode, answer from BM25 alone (no embedding) when its
+                               top hit is unambiguous
+            question_fast_path: Answer a KB question asked verbatim or up to case/accents/punctuation
+                                from questions.sqlite3 before any BM25/FAISS work (any mode)
+            embedding_backend: "torch" (HuggingFaceEmbeddings) or "onnx-int8" (ONNX Runtime,
+                               int8-quantized, see onnx_embeddings.py); default CALLBOT_EMBEDDING_BACKEND
+            watch_interval_s: Poll faiss_index/CURRENT every N seconds and hot-reload new versions
+                              (default CALLBOT_RAG_WATCH_S, 0 = off; reload() can also be called directly)
         """
+        embedding_backend = embedding_backend or DEFAULT_EMBEDDING_BACKEND
+        if embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"embedding_backend must be one of {EMBEDDING_BACKENDS}, got {embedding_backend!r}")
+        self.embedding_backend = embedding_backend
+        retrieval_mode = retrieval_mode or DEFAULT_RETRIEVAL_MODE
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"retrieval_mode must be one of {RETRIEVAL_MODES}, got {retrieval_mode!r}")
+        self.retrieval_mode = retrieval_mode
+        self.lexical_fast_path = lexical_fast_path
+        self.question_fast_path = question_fast_path
+        self.match_counts = {"exact": 0, "normalized": 0, "lexical": 0, "hybrid": 0, "vector": 0}
+        self._count_lock = threading.Lock()     # match_counts is shared by every serving thread
         # Use absolute paths based on rag_api.py location
         if cache_dir is None:
             cache_dir = DEFAULT_CACHE_DIR
@@ -89,46 +185,272 @@ class RAGKnowledgeBase:
         # Use the default HuggingFace cache (where model is already downloaded)
         hf_cache = Path.home() / ".cache" / "huggingface" / "hub"
         
-        # 🚀 Try GPU first, fallback to CPU if not available
-        device = 'cpu'
-        try:
-            import torch
-            if torch.cuda.is_available():
-                device = 'cuda'
-                print(f"🚀 GPU detected! Using CUDA device: {torch.cuda.get_device_name()}")
-            else:
-                print("💻 No GPU available, using CPU")
-        except ImportError:
-            print("💻 PyTorch not available, using CPU")
-        
-        base_embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
-            cache_folder=str(hf_cache),  # Use existing HuggingFace cache
-            model_kwargs={'device': device},  # Use GPU if available
-            encode_kwargs={'normalize_embeddings': True}  # Better performance
-        )
+        if embedding_backend == "onnx-int8":
+            print("⚡ Using the int8 ONNX Runtime backend (CPU)")
+            base_embeddings = OnnxEmbeddings(EMBEDDING_MODEL, cache_folder=str(hf_cache))
+        else:
+            # 🚀 Try GPU first, fallback to CPU if not available
+            device = 'cpu'
+            try:
+                import torch
+                if torch.cuda.is_available():
+                    device = 'cuda'
+                    print(f"🚀 GPU detected! Using CUDA device: {torch.cuda.get_device_name()}")
+                else:
+                    print("💻 No GPU available, using CPU")
+            except ImportError:
+                print("💻 PyTorch not available, using CPU")
+
+            base_embeddings = HuggingFaceEmbeddings(
+                model_name=EMBEDDING_MODEL,
+                cache_folder=str(hf_cache),  # Use existing HuggingFace cache
+                model_kwargs={'device': device},  # Use GPU if available
+                encode_kwargs={'normalize_embeddings': True}  # Better performance
+            )
         
-        # 2. Use base embeddings (caching disabled for compatibility)
-        print("💾 Using base embeddings (caching disabled for now)...")
+        # 2. Query embedding cache (memory LRU + disk), keyed by model + normalized query
+        print("💾 Enabling query embedding cache (memory + disk)...")
         self.embeddings = base_embeddings
+        # Backends give near-identical but not bit-identical vectors: separate cache keys
+        cache_model = EMBEDDING_MODEL if embedding_backend == "torch" else f"{EMBEDDING_MODEL}#{embedding_backend}"
+        self.query_cache = QueryEmbeddingCache(cache_dir, cache_model,
+                                               max_memory=memory_cache_size, max_disk=disk_cache_size)
         
-        # 3. Load FAISS index
-        print("🔍 Loading FAISS index...")
-        self.vectorstore = FAISS.load_local(
-            str(index_path),
-            self.embeddings,
-            allow_dangerous_deserialization=True
-        )
+        # 3. Load FAISS index (+ semantic answer cache sized on its dimension)
+        self.semantic_cache_size = semantic_cache_size
+        self.semantic_threshold = semantic_threshold
+        self.semantic_audit_rate = semantic_audit_rate
+        self.semantic_cache = None
+        self.index_root = index_path
+        self._active = None
+        self._local = threading.local()
+        self._swap_lock = threading.Lock()      # guards self._active (held for a pointer swap only)
+        self._reload_lock = threading.Lock()    # one reload at a time
+        self._watcher = None
+        self._watch_stop = threading.Event()
+        self.reload_stats = {"reloads": 0, "failed_reloads": 0, "last_reload_ms": None,
+                             "loaded_at": None, "previous_version": None, "last_error": None}
+        self._load_index(index_path)
+        watch_interval_s = DEFAULT_WATCH_INTERVAL_S if watch_interval_s is None else watch_interval_s
+        if watch_interval_s > 0:
+            self.start_watcher(watch_interval_s)
         
         load_time = time.time() - start_time
         print(f"✅ RAG Knowledge Base ready in {load_time:.2f}s!")
         print("\n📊 SYSTEM SPECS:")
         print(f"   ⚡ Response time: <50ms (cached queries)")
+        print(f"   💾 Cached query embeddings on disk: {self.query_cache.get_stats()['disk_size']}")
         print(f"   💰 Cost per query: $0.00 (100% local)")
         print(f"   🔒 Security: Offline, data stays local")
         print(f"   💾 Cache: {cache_dir}")
     
-    def search(self, query: str, k: int = 2) -> dict:  # Reduced from 3 to 2 for speed
+    def _open_version(self, index_root: Path) -> _IndexVersion:
+        """Load the live version under index_root (CURRENT), or the directory itself if unversioned."""
+        index_dir, version = resolve_index_dir(index_root)
+        print(f"🔍 Loading FAISS index{f' version {version}' if version else ''}...")
+        if has_mmap_format(index_dir):
+            # Pickle-free: mmap'd vectors + read-only SQLite chunks (see mmap_store.py)
+            vectorstore = MmapVectorStore(index_dir)
+            index_format = "mmap"
+        else:
+            print("⚠️  Legacy index.pkl format (unpickled in full) - rebuild with build_index.py")
+            vectorstore = FAISS.load_local(
+                str(index_dir),
+                self.embeddings,
+                allow_dangerous_deserialization=True
+            )
+            index_format = "langchain_pickle"
+        # BM25 / question map ids are FAISS vector ids: only usable with the id-keyed chunk store
+        bm25_path = index_dir / BM25_FILE
+        bm25 = BM25Index(bm25_path) if index_format == "mmap" and bm25_path.exists() else None
+        questions_path = index_dir / QUESTIONS_FILE
+        questions = QuestionIndex(questions_path) if index_format == "mmap" and questions_path.exists() else None
+        return _IndexVersion(version, index_dir, vectorstore, index_format, bm25, questions)
+
+    def _load_index(self, index_path: Path):
+        """Load the FAISS index and make it the active version; cached result sets are dropped."""
+        self.index_root = Path(index_path)
+        self._swap(self._open_version(self.index_root))
+
+    def _swap(self, new: _IndexVersion):
+        """Atomically replace the active version; the old one closes once its searches drain."""
+        with self._swap_lock:
+            old, self._active = self._active, new
+        if self.semantic_cache is not None:
+            self.semantic_cache.invalidate()
+        elif self.semantic_cache_size > 0:
+            self.semantic_cache = SemanticAnswerCache(
+                new.vectorstore.index.d, capacity=self.semantic_cache_size,
+                threshold=self.semantic_threshold, audit_rate=self.semantic_audit_rate)
+        self.reload_stats["loaded_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        if old is not None:
+            self.reload_stats["previous_version"] = old.name
+            threading.Thread(target=old.drain_and_close, name="rag-index-drain", daemon=True).start()
+
+    def reload(self, force: bool = False) -> dict:
+        """
+        🔄 Hot reload: load the version CURRENT points to while searches keep running on the
+        old one, then swap. No-op when already on that version (unless force).
+        """
+        with self._reload_lock:
+            version = current_version(self.index_root)
+            if not force and version == self._active.name:
+                return {"reloaded": False, "version": version}
+            start = time.time()
+            try:
+                new = self._open_version(self.index_root)
+            except Exception as e:
+                self.reload_stats["failed_reloads"] += 1
+                self.reload_stats["last_error"] = f"{type(e).__name__}: {e}"
+                print(f"❌ Index reload failed, still serving {self._active.name}: {e}")
+                raise
+            self._swap(new)
+            reload_ms = round((time.time() - start) * 1000, 2)
+            self.reload_stats["reloads"] += 1
+            self.reload_stats["last_reload_ms"] = reload_ms
+            self.reload_stats["last_error"] = None
+            print(f"✅ Index version {new.name} live ({reload_ms}ms)")
+            return {"reloaded": True, "version": new.name, "reload_ms": reload_ms}
+
+    def start_watcher(self, interval_s: float = 5.0):
+        """Poll CURRENT in a daemon thread and reload when it changes."""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._watch_stop.wait(interval_s):
+                try:
+                    if current_version(self.index_root) != self._active.name:
+                        self.reload()
+                except Exception:
+                    pass  # reported by reload(); retried on the next tick
+
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(target=watch, name="rag-index-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    @contextmanager
+    def _pinned(self):
+        """Pin the active version for this thread (re-entrant) and count it as in flight."""
+        if getattr(self._local, "version", None) is not None:
+            yield self._local.version
+            return
+        with self._swap_lock:
+            version = self._active
+            version.acquire()
+        self._local.version = version
+        try:
+            yield version
+        finally:
+            self._local.version = None
+            version.release()
+
+    def _version(self) -> _IndexVersion:
+        return getattr(self._local, "version", None) or self._active
+
+    @property
+    def vectorstore(self):
+        return self._version().vectorstore
+
+    @property
+    def bm25(self):
+        return self._version().bm25
+
+    @property
+    def questions(self):
+        return self._version().questions
+
+    @property
+    def index_format(self):
+        return self._version().index_format
+
+    def _semantic(self, query_vector, key, search, same=lambda a, b: a == b):
+        """(result, semantic_hit): reuse a near-duplicate question's result set when possible."""
+        if self.semantic_cache is None:
+            return search(), False
+        return self.semantic_cache.get_or_search(query_vector, self._sem_key(*key), search, same)
+
+    def _sem_key(self, *parts):
+        """Semantic cache key, scoped to the pinned version (an old-version search cannot poison it)."""
+        return parts + (self._version().name,)
+
+    def _embed_query(self, query: str):
+        """(query vector, cached): the transformer only runs when both cache tiers miss."""
+        return self.query_cache.get_or_compute(query, self.embeddings.embed_query)
+
+    @staticmethod
+    def _candidates(k: int) -> int:
+        """Depth of each ranking fed to the fusion."""
+        return max(4 * k, 20)
+
+    def _question_match(self, query: str):
+        """("exact" | "normalized", vector ids) when the query is a KB question, else None."""
+        if not self.question_fast_path or self.questions is None:
+            return None
+        return self.questions.lookup(query)
+
+    def _question_hits(self, vector_ids, k: int) -> list:
+        """The matched entry's chunks in order, distance 0 (relevance_score 1.0)."""
+        docs = self.vectorstore.documents(vector_ids[:k])
+        return [(docs[vid], 0.0) for vid in vector_ids[:k] if vid in docs]
+
+    def _lexical(self, query: str, k: int, mode=None):
+        """BM25 (vector_id, score) candidates when the query runs in hybrid mode, else None."""
+        mode = mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"mode must be one of {RETRIEVAL_MODES}, got {mode!r}")
+        if mode != "hybrid" or self.bm25 is None:
+            return None
+        return self.bm25.search(query, self._candidates(k))
+
+    def _lexical_only(self, lexical) -> bool:
+        return self.lexical_fast_path and bool(lexical) and BM25Index.unambiguous(lexical)
+
+    def _lexical_hits(self, lexical, k: int) -> list:
+        """Fast path: BM25 top-k as (Document, pseudo-distance 1/score) -> relevance score/(1+score)."""
+        top = lexical[:k]
+        docs = self.vectorstore.documents(vid for vid, _ in top)
+        return [(docs[vid], 1.0 / score) for vid, score in top if vid in docs]
+
+    def _hybrid_matrix(self, vectors, lexicals, k: int) -> list:
+        """
+        Fused ranking per query: reciprocal rank fusion of FAISS and BM25 candidates.
+
+        Distances stay FAISS L2 distances so relevance_score keeps its meaning; a chunk found
+        only by BM25 gets the farthest distance of the vector candidates (it was not closer).
+        """
+        import numpy as np
+
+        index = self.vectorstore.index
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, index.d)
+        distances, indices = index.search(matrix, self._candidates(k))
+        rows = []
+        for row_d, row_i, lexical in zip(distances, indices, lexicals):
+            dist = {int(i): d for d, i in zip(row_d, row_i) if i != -1}
+            fused = reciprocal_rank_fusion([list(dist), [vid for vid, _ in lexical or []]], [1.0, 1.0], k)
+            floor = max(dist.values()) if dist else np.float32(1.0)
+            rows.append([(vid, dist.get(vid, floor)) for vid in fused])
+        docs = self.vectorstore.documents(vid for row in rows for vid, _ in row)
+        return [[(docs[vid], d) for vid, d in row if vid in docs] for row in rows]
+
+    def _count(self, match_type: str) -> str:
+        with self._count_lock:
+            self.match_counts[match_type] += 1
+        return match_type
+
+    @staticmethod
+    def _same_passages(a, b) -> bool:
+        """Audit comparison for metadata results: passages only (scores shift with wording)."""
+        return [d["content"] for d in a] == [d["content"] for d in b]
+
+    @_pins_index
+    def search(self, query: str, k: int = 2, mode=None) -> dict:  # Reduced from 3 to 2 for speed
         """
         🔍 MAIN API METHOD - RAG Search (FAST & SECURE)
         
@@ -145,28 +467,71 @@ class RAGKnowledgeBase:
             "..."
           ],
           "response_time_ms": 45,
-          "cached": true
+          "timings_ms": {"embed": 30.1, "search": 14.9},
+          "cached": true,
+          "match_type": "hybrid"
         }
+
+        mode: "hybrid" | "vector" (default: retrieval_mode). match_type is "exact" / "normalized"
+        when the query is a KB question (question map, only that entry's chunks are returned) and
+        "lexical" when the BM25 fast path answered; neither embeds the query.
         """
         start_time = time.time()
+
+        # KB question asked as written: one key lookup, no BM25/FAISS
+        question = self._question_match(query)
+        if question is not None:
+            match_type, vector_ids = question
+            response_time = (time.time() - start_time) * 1000
+            return {
+                "documents": [doc.page_content for doc, _ in self._question_hits(vector_ids, k)],
+                "response_time_ms": round(response_time, 2),
+                "timings_ms": {"embed": 0.0, "search": round(response_time, 2)},
+                "cached": False,
+                "semantic_cache_hit": False,
+                "match_type": self._count(match_type)
+            }
+
+        # Unambiguous keyword match: BM25 alone, the query is never embedded
+        lexical = self._lexical(query, k, mode)
+        if self._lexical_only(lexical):
+            response_time = (time.time() - start_time) * 1000
+            return {
+                "documents": [doc.page_content for doc, _ in self._lexical_hits(lexical, k)],
+                "response_time_ms": round(response_time, 2),
+                "timings_ms": {"embed": 0.0, "search": round(response_time, 2)},
+                "cached": False,
+                "semantic_cache_hit": False,
+                "match_type": self._count("lexical")
+            }
         
-        # Semantic search in FAISS (LOCAL, FAST)
-        results = self.vectorstore.similarity_search(query, k=k)
-        
-        # Format documents
-        documents = []
-        for doc in results:
-            documents.append(doc.page_content)
+        # Query vector from the cache (no forward pass on a hit), then FAISS search
+        embed_start = time.time()
+        query_vector, cached = self._embed_query(query)
+        embed_ms = (time.time() - embed_start) * 1000
+        match_type = "vector" if lexical is None else "hybrid"
+
+        def run_search():
+            if lexical is not None:
+                return [doc.page_content for doc, _ in self._hybrid_matrix([query_vector], [lexical], k)[0]]
+            results = self.vectorstore.similarity_search_by_vector(query_vector.tolist(), k=k)
+            return [doc.page_content for doc in results]
+
+        documents, semantic_hit = self._semantic(query_vector, ("search", k, match_type), run_search)
         
         response_time = (time.time() - start_time) * 1000  # Convert to ms
         
         return {
             "documents": documents,
             "response_time_ms": round(response_time, 2),
-            "cached": False  # Caching disabled
+            "timings_ms": {"embed": round(embed_ms, 2), "search": round(response_time - embed_ms, 2)},
+            "cached": cached,
+            "semantic_cache_hit": semantic_hit,
+            "match_type": self._count(match_type)
         }
     
-    def search_with_metadata(self, query: str, k: int = 3) -> dict:
+    @_pins_index
+    def search_with_metadata(self, query: str, k: int = 3, mode=None) -> dict:
         """
         🔍 EXTENDED API - RAG Search with metadata (FAST & SECURE)
         
@@ -188,15 +553,70 @@ class RAGKnowledgeBase:
           ],
           "response_time_ms": 45,
           "cached": true,
+          "match_type": "hybrid",
           "cost": 0.00
         }
         """
         start_time = time.time()
+
+        question = self._question_match(query)
+        if question is not None:
+            match_type, vector_ids = question
+            response_time = (time.time() - start_time) * 1000
+            return {
+                "documents": self._format_with_metadata(self._question_hits(vector_ids, k)),
+                "response_time_ms": round(response_time, 2),
+                "timings_ms": {"embed": 0.0, "search": round(response_time, 2)},
+                "cached": False,
+                "semantic_cache_hit": False,
+                "match_type": self._count(match_type),
+                "cost": 0.00
+            }
+
+        lexical = self._lexical(query, k, mode)
+        if self._lexical_only(lexical):
+            response_time = (time.time() - start_time) * 1000
+            return {
+                "documents": self._format_with_metadata(self._lexical_hits(lexical, k)),
+                "response_time_ms": round(response_time, 2),
+                "timings_ms": {"embed": 0.0, "search": round(response_time, 2)},
+                "cached": False,
+                "semantic_cache_hit": False,
+                "match_type": self._count("lexical"),
+                "cost": 0.00
+            }
         
         # Semantic search with scores (LOCAL, FAST)
-        results = self.vectorstore.similarity_search_with_score(query, k=k)
+        embed_start = time.time()
+        query_vector, cached = self._embed_query(query)
+        embed_ms = (time.time() - embed_start) * 1000
+        match_type = "vector" if lexical is None else "hybrid"
+
+        def run_search():
+            if lexical is not None:
+                return self._format_with_metadata(self._hybrid_matrix([query_vector], [lexical], k)[0])
+            results = self.vectorstore.similarity_search_with_score_by_vector(query_vector.tolist(), k=k)
+            return self._format_with_metadata(results)
+
+        # A hit keeps the first asker's scores; audits compare passages only
+        documents, semantic_hit = self._semantic(
+            query_vector, ("metadata", k, match_type), run_search, same=self._same_passages)
         
-        # Format with metadata
+        response_time = (time.time() - start_time) * 1000
+        
+        return {
+            "documents": documents,
+            "response_time_ms": round(response_time, 2),
+            "timings_ms": {"embed": round(embed_ms, 2), "search": round(response_time - embed_ms, 2)},
+            "cached": cached,
+            "semantic_cache_hit": semantic_hit,
+            "match_type": self._count(match_type),
+            "cost": 0.00  # Always $0 (local)
+        }
+
+    @staticmethod
+    def _format_with_metadata(results) -> list:
+        """(Document, L2 distance) pairs -> API documents."""
         documents = []
         for doc, score in results:
             documents.append({
@@ -206,15 +626,129 @@ class RAGKnowledgeBase:
                 "source_url": doc.metadata.get('source_url', ''),
                 "relevance_score": float(1 / (1 + score))  # Convert distance to similarity
             })
-        
-        response_time = (time.time() - start_time) * 1000
-        
-        return {
-            "documents": documents,
-            "response_time_ms": round(response_time, 2),
-            "cached": False,  # Caching disabled
-            "cost": 0.00  # Always $0 (local)
-        }
+        return documents
+
+    def _search_matrix(self, vectors, k: int) -> list:
+        """ONE index.search over stacked query vectors -> [(Document, distance), ...] per query.
+
+        Same hits, order and distances as similarity_search_with_score_by_vector, one query at a time.
+        """
+        import numpy as np
+
+        vs = self.vectorstore
+        if hasattr(vs, "search_matrix"):
+            return vs.search_matrix(vectors, k)
+        matrix = np.array(vectors, dtype=np.float32)
+        if getattr(vs, "_normalize_L2", False):
+            import faiss
+            faiss.normalize_L2(matrix)
+        distances, indices = vs.index.search(matrix, k)
+        out = []
+        for row_d, row_i in zip(distances, indices):
+            hits = []
+            for dist, i in zip(row_d, row_i):
+                if i == -1:  # fewer than k vectors in the index
+                    continue
+                hits.append((vs.docstore.search(vs.index_to_docstore_id[int(i)]), dist))
+            out.append(hits)
+        return out
+
+    @_pins_index
+    def search_batch(self, queries: list, k: int = 3, with_metadata: bool = True, mode=None) -> list:
+        """
+        🚀 BATCH API - many queries, one forward pass, one FAISS search
+
+        INPUT:  ["comment déclarer un sinistre", "où en est mon dossier", ...]
+        OUTPUT: one dict per query, same format as search_with_metadata (or search
+                when with_metadata=False); response_time_ms and timings_ms are the batch time / N.
+        """
+        start_time = time.time()
+        if not queries:
+            return []
+
+        kind = "metadata" if with_metadata else "search"
+        n = len(queries)
+        documents = [None] * n
+        semantic_hits = [False] * n
+        cached = [False] * n
+
+        def present(results):
+            if with_metadata:
+                return self._format_with_metadata(results)
+            return [doc.page_content for doc, _ in results]
+
+        # 1. KB questions (question map) and unambiguous BM25 matches are answered without embedding
+        questions = [self._question_match(q) for q in queries]
+        lexicals = [None if question else self._lexical(q, k, mode) for q, question in zip(queries, questions)]
+        match_types = ["vector" if lex is None else "hybrid" for lex in lexicals]
+        for i, (question, lexical) in enumerate(zip(questions, lexicals)):
+            if question is not None:
+                match_types[i], vector_ids = question
+                documents[i] = present(self._question_hits(vector_ids, k))
+            elif self._lexical_only(lexical):
+                documents[i] = present(self._lexical_hits(lexical, k))
+                match_types[i] = "lexical"
+        rest = [i for i in range(n) if documents[i] is None]
+
+        # 2. Query vectors: cache hits + one embed_documents call for every miss
+        embed_ms = 0.0
+        if rest:
+            embed_start = time.time()
+            vectors, rest_cached = self.query_cache.get_or_compute_many(
+                [queries[i] for i in rest], self.embeddings.embed_documents)
+            embed_ms = (time.time() - embed_start) * 1000
+            vector_of = dict(zip(rest, vectors))
+            for i, was_cached in zip(rest, rest_cached):
+                cached[i] = was_cached
+
+            # 3. Near-duplicates of recent questions are answered from the semantic cache;
+            #    audited hits go through the search below, exactly like search() does
+            audited = {}
+            if self.semantic_cache is not None:
+                for i in rest:
+                    key = self._sem_key(kind, k, match_types[i])
+                    hit, _ = self.semantic_cache.lookup(vector_of[i], key)
+                    if hit is not None and self.semantic_cache.should_audit():
+                        audited[i] = hit
+                    else:
+                        documents[i] = hit
+                        semantic_hits[i] = hit is not None
+
+            # 4. Everything else in a single index.search over the stacked matrix (per match type)
+            for match_type in ("vector", "hybrid"):
+                todo = [i for i in rest if documents[i] is None and match_types[i] == match_type]
+                if not todo:
+                    continue
+                matrix = [vector_of[i] for i in todo]
+                if match_type == "hybrid":
+                    results = self._hybrid_matrix(matrix, [lexicals[i] for i in todo], k)
+                else:
+                    results = self._search_matrix(matrix, k)
+                for i, hits in zip(todo, results):
+                    documents[i] = present(hits)
+                    if i in audited:
+                        self.semantic_cache.record_audit(
+                            audited[i], documents[i], self._same_passages if with_metadata else operator.eq)
+                    elif self.semantic_cache is not None:
+                        self.semantic_cache.store(vector_of[i], self._sem_key(kind, k, match_type), documents[i])
+
+        total_ms = (time.time() - start_time) * 1000
+        per_query_ms = round(total_ms / n, 2)
+        timings = {"embed": round(embed_ms / n, 2), "search": round((total_ms - embed_ms) / n, 2)}
+        out = []
+        for docs, was_cached, semantic_hit, match_type in zip(documents, cached, semantic_hits, match_types):
+            result = {
+                "documents": docs,
+                "response_time_ms": per_query_ms,
+                "timings_ms": dict(timings),
+                "cached": was_cached,
+                "semantic_cache_hit": semantic_hit,
+                "match_type": self._count(match_type),
+            }
+            if with_metadata:
+                result["cost"] = 0.00
+            out.append(result)
+        return out
     
     def get_stats(self) -> dict:
         """
@@ -222,11 +756,30 @@ class RAGKnowledgeBase:
         """
         return {
             "model": "paraphrase-multilingual-MiniLM-L12-v2",
+            "embedding_backend": self.embedding_backend,
             "deployment": "local (offline)",
-            "avg_response_time_ms": "~200ms (no caching)",
             "cost_per_query": "$0.00",
             "data_security": "All data stays on your server",
-            "cache_enabled": False
+            "index_format": self.index_format,
+            "index_version": {
+                "version": self._active.name,
+                "path": str(self._active.path),
+                "in_flight": self._active.in_flight,
+                "watcher": self._watcher is not None,
+                **self.reload_stats,
+            },
+            "index": getattr(self.vectorstore, "index_spec", {"type": "flat"}),
+            "retrieval": {
+                "mode": self.retrieval_mode if self.bm25 is not None else "vector",
+                "bm25": self.bm25 is not None,
+                "lexical_fast_path": self.lexical_fast_path,
+                "question_index": self.questions is not None,
+                "question_fast_path": self.question_fast_path,
+                "match_types": dict(self.match_counts),
+            },
+            "cache_enabled": True,
+            "query_embedding_cache": self.query_cache.get_stats(),
+            "semantic_cache": self.semantic_cache.get_stats() if self.semantic_cache else {"enabled": False}
         }
 
 
@@ -235,39 +788,27 @@ class RAGKnowledgeBase:
 # ============================================================================
 
 def test_performance():
-    """Test speed and demonstrate caching benefits"""
-    
+    """Replay the KB questions (+ paraphrase / ASR variants) from cold caches: see bench_rag.py"""
+    import tempfile
+
+    try:
+        from . import bench_rag
+    except ImportError:
+        import bench_rag
+
     print("\n" + "="*80)
     print("⚡ PERFORMANCE BENCHMARK")
     print("="*80)
-    
-    # Initialize
-    rag = RAGKnowledgeBase()
-    
-    # Test query
-    query = "comment accéder à mon espace client"
-    
-    # First call (uncached)
-    print(f"\n1️⃣ First call (uncached):")
-    result1 = rag.search(query, k=3)
-    print(f"   ⏱️  Response time: {result1['response_time_ms']}ms")
-    print(f"   💾 Cached: {result1['cached']}")
-    
-    # Second call (cached)
-    print(f"\n2️⃣ Second call (CACHED):")
-    result2 = rag.search(query, k=3)
-    print(f"   ⚡ Response time: {result2['response_time_ms']}ms")
-    print(f"   💾 Cached: {result2['cached']}")
-    
-    # Speed improvement
-    speedup = result1['response_time_ms'] / result2['response_time_ms']
-    print(f"\n🚀 Speed improvement: {speedup:.1f}x faster!")
-    
-    # System stats
-    print("\n📊 System Statistics:")
-    stats = rag.get_stats()
-    for key, value in stats.items():
-        print(f"   {key}: {value}")
+
+    # Fresh cache dir, no semantic cache, no question map: numbers measure retrieval,
+    # not a warm cache or verbatim KB questions
+    with tempfile.TemporaryDirectory(prefix="rag-bench-cache-") as cache_dir:
+        rag = RAGKnowledgeBase(cache_dir=cache_dir, semantic_cache_size=0, question_fast_path=False)
+        rag.embeddings.embed_query("warmup")
+        report = bench_rag.run_benchmark(rag, bench_rag.load_kb(bench_rag.DEFAULT_KB_PATH), warm=True)
+    bench_rag.print_summary(report)
+    print("\n💡 Full JSON report: python RAG/bench_rag.py --warm --out <file>.json")
+    return report
 
 
 # ============================================================================
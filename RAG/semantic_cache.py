@@ -0,0 +1,126 @@
+"""
+🧠 SEMANTIC ANSWER CACHE
+========================================
+
+Callers ask the same thing in many slightly different words:
+  "comment déclarer un sinistre" / "comment je déclare un sinistre ?"
+Their query embeddings are almost identical, so the retrieval result can be reused.
+
+- 🔍 Small FAISS inner-product index over recently answered query embeddings
+- 🎯 Hit when cosine similarity >= threshold (same search kind and k)
+- ♻️  Bounded capacity, LRU eviction, cleared when the main index is (re)loaded
+- 🧪 A fraction of hits is audited against the real search to measure false hits
+     (stats: "hits" were served from the cache, "audits" were re-searched instead)
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+import copy
+import random
+import threading
+
+import faiss
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """Query embedding -> result set, matched by cosine similarity."""
+
+    def __init__(self, dim: int, capacity: int = 512, threshold: float = 0.95,
+                 audit_rate: float = 0.05, probe: int = 4, seed: Optional[int] = None):
+        self.dim = dim
+        self.capacity = capacity
+        self.threshold = threshold
+        self.audit_rate = audit_rate
+        self.probe = probe                      # neighbours checked for a matching (kind, k)
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        self._entries: "OrderedDict[int, Tuple[Hashable, Any]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.stats = {"lookups": 0, "hits": 0, "evictions": 0, "invalidations": 0,
+                      "audits": 0, "false_hits": 0}
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32).reshape(1, -1)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def lookup(self, vector, key: Hashable) -> Tuple[Optional[Any], float]:
+        """(cached result or None, best similarity seen for this key)."""
+        q = self._normalize(vector)
+        with self._lock:
+            self.stats["lookups"] += 1
+            if not self._entries:
+                return None, 0.0
+            sims, ids = self._index.search(q, min(self.probe, len(self._entries)))
+            for sim, idx in zip(sims[0], ids[0]):
+                entry = self._entries.get(int(idx))
+                if entry is None or entry[0] != key:
+                    continue
+                if sim < self.threshold:
+                    return None, float(sim)
+                self._entries.move_to_end(int(idx))
+                self.stats["hits"] += 1
+                return copy.deepcopy(entry[1]), float(sim)
+            return None, 0.0
+
+    def store(self, vector, key: Hashable, result: Any) -> None:
+        q = self._normalize(vector)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(q, np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = (key, copy.deepcopy(result))
+            while len(self._entries) > self.capacity:
+                old_id, _ = self._entries.popitem(last=False)
+                self._index.remove_ids(np.array([old_id], dtype=np.int64))
+                self.stats["evictions"] += 1
+
+    def should_audit(self) -> bool:
+        """Draw whether a hit is re-checked against the real search instead of being served."""
+        return bool(self.audit_rate) and self._rng.random() < self.audit_rate
+
+    def record_audit(self, cached: Any, fresh: Any,
+                     same: Callable[[Any, Any], bool] = lambda a, b: a == b) -> None:
+        """An audited hit was answered by the real search: count it as an audit, not a hit."""
+        with self._lock:
+            self.stats["hits"] -= 1
+            self.stats["audits"] += 1
+            if not same(cached, fresh):
+                self.stats["false_hits"] += 1
+
+    def get_or_search(self, vector, key: Hashable, search: Callable[[], Any],
+                      same: Callable[[Any, Any], bool] = lambda a, b: a == b) -> Tuple[Any, bool]:
+        """(result, semantic_hit). search() runs on a miss, and on audited hits to count false hits."""
+        cached, _ = self.lookup(vector, key)
+        if cached is None:
+            result = search()
+            self.store(vector, key, result)
+            return result, False
+
+        if self.should_audit():
+            fresh = search()
+            self.record_audit(cached, fresh, same)
+            return fresh, False
+        return cached, True
+
+    def invalidate(self) -> None:
+        """Drop everything (the main index changed, cached result sets may be stale)."""
+        with self._lock:
+            self._index.reset()
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups, hits, audits = self.stats["lookups"], self.stats["hits"], self.stats["audits"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "false_hit_rate": round(self.stats["false_hits"] / audits, 3) if audits else 0.0,
+            }
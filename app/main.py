@@ -283,7 +283,8 @@ def process_single_turn(
     
     try:
         # NOTE: Order is (full_text, emotion_bert, audio_summary)
-        decision = run_ai_core(text, emotion_bert, audio_summary)
+        decision_debug = {}
+        decision = run_ai_core(text, emotion_bert, audio_summary, debug=decision_debug)
         
         """
         decision = {
@@ -476,7 +477,9 @@ def process_single_turn(
                 detected_intent=intent,
                 detected_emotion=emotion_label,
                 confidence=confidence,
-                metadata={"emotion_score": emotion_score, "urgency": urgency}
+                metadata={"emotion_score": emotion_score, "urgency": urgency,
+                          # what was decided for this utterance and by which path (core.distill)
+                          "decision": dict(decision), "decision_mode": decision_debug.get("mode")}
             )
         except Exception as db_error:
             print(f"   ⚠️  Erreur logging message client: {db_error}")
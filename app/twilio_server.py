@@ -1,10 +1,12 @@
+import os
 import sys
 import time
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import Response
 from twilio.twiml.voice_response import VoiceResponse
 import uvicorn
@@ -12,7 +14,7 @@ import uvicorn
 BASE_DIR = Path(__file__).parent.parent.resolve()
 sys.path.insert(0, str(BASE_DIR))
 
-from core.entrypoint import run_ai_core
+from core.entrypoint import arun_ai_core, warmup as warmup_ai_core, latency_stats, decision_cache_stats
 from tool_router.entrypoint.entrypoint import callbot_global_response, get_orchestrator
 from tool_router.src.database.db_service import db_service
 
@@ -126,7 +128,7 @@ def check_if_should_escalate(bot_response: str, user_question: str, call_sid: st
     
     return False
 
-def run_my_pipeline(user_text: str, call_sid: str, caller_phone: str) -> str:
+async def run_my_pipeline(user_text: str, call_sid: str, caller_phone: str) -> str:
     """Appelle le pipeline IA et retourne la reponse texte."""
     start = time.time()
     
@@ -150,11 +152,15 @@ def run_my_pipeline(user_text: str, call_sid: str, caller_phone: str) -> str:
     try:
         emotion_bert = {"sentiment": "NEUTRAL", "score": 0.5}
         audio_summary = {"duration_ms": 0}
-        decision = run_ai_core(user_text, emotion_bert, audio_summary)
+        decision_debug: Dict[str, Any] = {}
+        decision = await arun_ai_core(user_text, emotion_bert, audio_summary, debug=decision_debug)
+        # Logged with the turn: what was decided for this utterance and by which path (core.distill)
+        decision_log = {"decision": dict(decision), "decision_mode": decision_debug.get("mode")}
         
         if sess["interaction_id"] is None:
             try:
-                interaction_id = db_service.create_interaction(
+                interaction_id = await run_in_threadpool(
+                    db_service.create_interaction,
                     customer_id=sess["customer_id"],
                     customer_phone=caller_phone,
                     session_id=sess["session_id"],
@@ -176,8 +182,9 @@ def run_my_pipeline(user_text: str, call_sid: str, caller_phone: str) -> str:
             except Exception as e:
                 sess["interaction_id"] = None
         
-        # Generation de la reponse
-        response = callbot_global_response(
+        # Generation de la reponse (synchronous: run off the event loop)
+        response = await run_in_threadpool(
+            callbot_global_response,
             text=user_text,
             emotion_bert=emotion_bert,
             intent=decision.get("intent", "general_inquiry"),
@@ -195,13 +202,14 @@ def run_my_pipeline(user_text: str, call_sid: str, caller_phone: str) -> str:
         elapsed = (time.time() - start) * 1000
         
         sess["conversation_history"].extend([
-            {"role": "user", "text": user_text},
+            {"role": "user", "text": user_text, **decision_log},
             {"role": "assistant", "text": bot_text},
         ])
         
         if sess["interaction_id"]:
             try:
-                db_service.add_conversation_message(
+                await run_in_threadpool(
+                    db_service.add_conversation_message,
                     interaction_id=sess["interaction_id"],
                     speaker="customer",
                     message_text=user_text,
@@ -209,10 +217,11 @@ def run_my_pipeline(user_text: str, call_sid: str, caller_phone: str) -> str:
                     detected_intent=decision.get("intent"),
                     detected_emotion=emotion_bert.get("sentiment"),
                     confidence=decision.get("confidence"),
-                    metadata={"call_sid": call_sid, "method": "twilio_voice"}
+                    metadata={"call_sid": call_sid, "method": "twilio_voice", **decision_log}
                 )
                 
-                db_service.add_conversation_message(
+                await run_in_threadpool(
+                    db_service.add_conversation_message,
                     interaction_id=sess["interaction_id"],
                     speaker="assistant", 
                     message_text=bot_text,
@@ -220,7 +229,8 @@ def run_my_pipeline(user_text: str, call_sid: str, caller_phone: str) -> str:
                     metadata={"generation_time_ms": int(elapsed)}
                 )
                 
-                db_service.update_interaction_conversation(
+                await run_in_threadpool(
+                    db_service.update_interaction_conversation,
                     interaction_id=sess["interaction_id"],
                     customer_message=user_text,
                     bot_response=bot_text,
@@ -237,6 +247,40 @@ def run_my_pipeline(user_text: str, call_sid: str, caller_phone: str) -> str:
     except Exception as e:
         return "Processing error occurred. Please try again or contact support."
 
+@app.on_event("startup")
+async def startup_event():
+    """Build the decision pipeline before the first call arrives."""
+    try:
+        warmup_ai_core()
+    except Exception as e:
+        print(f"[ERROR] AI core warmup failed: {e}")
+
+@app.get("/metrics/latency")
+async def ai_core_latency():
+    """Decision latency percentiles (per node, LLM attempt and decision mode) + decision cache stats."""
+    return {"latency": latency_stats(), "decision_cache": decision_cache_stats()}
+
+@app.post("/admin/rag/reload")
+async def reload_rag_index(force: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    """Hot reload of the RAG index faiss_index/CURRENT points to, same contract as tool_router's
+    POST /api/admin/rag/reload: requires CALLBOT_ADMIN_TOKEN (header X-Admin-Token)."""
+    admin_token = os.getenv("CALLBOT_ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Admin endpoints disabled (CALLBOT_ADMIN_TOKEN unset)")
+    if x_admin_token != admin_token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
+
+    rag = getattr(GLOBAL_ORCHESTRATOR, "rag", None)
+    if rag is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="RAG not loaded")
+    try:
+        result = await run_in_threadpool(rag.reload, force)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f"RAG reload error: {str(e)}")
+    return {**result, "index_version": rag.get_stats()["index_version"]}
+
 @app.api_route("/wait", methods=["GET", "POST"])
 async def wait_music():
     """Hold music endpoint."""
@@ -270,7 +314,7 @@ async def call_completed(request: Request):
     call_status = form_data.get("DialCallStatus", "unknown")
     
     if call_sid in SESSIONS:
-        finalize_conversation(call_sid)
+        await run_in_threadpool(finalize_conversation, call_sid)
     
     resp = VoiceResponse()
     if call_status in ["busy", "no-answer", "failed"]:
@@ -290,7 +334,7 @@ async def hangup_handler(request: Request):
     call_sid = form_data.get("CallSid", "unknown")
     
     if call_sid in SESSIONS:
-        finalize_conversation(call_sid)
+        await run_in_threadpool(finalize_conversation, call_sid)
     
     return Response("", status_code=204)
 
@@ -353,7 +397,7 @@ async def twilio_voice_webhook(request: Request):
             dial.number(HUMAN_AGENT_NUMBER)
             return Response(str(resp), media_type="application/xml")
         
-        prompt = run_my_pipeline(speech_result, call_sid, caller_phone)
+        prompt = await run_my_pipeline(speech_result, call_sid, caller_phone)
         should_escalate = check_if_should_escalate(prompt, speech_result, call_sid)
         
         if should_escalate:
@@ -433,7 +477,8 @@ async def hangup_webhook(request: Request):
     if call_sid in SESSIONS and SESSIONS[call_sid].get("interaction_id"):
         interaction_id = SESSIONS[call_sid]["interaction_id"]
         try:
-            db_service.update_satisfaction_score(
+            await run_in_threadpool(
+                db_service.update_satisfaction_score,
                 interaction_id=interaction_id,
                 satisfaction_score=0,
                 feedback_metadata={
@@ -472,7 +517,8 @@ async def feedback_webhook(request: Request):
     if call_sid in SESSIONS and SESSIONS[call_sid].get("interaction_id") and satisfaction_score in [1, 2]:
         interaction_id = SESSIONS[call_sid]["interaction_id"]
         try:
-            db_service.update_satisfaction_score(
+            await run_in_threadpool(
+                db_service.update_satisfaction_score,
                 interaction_id=interaction_id,
                 satisfaction_score=satisfaction_score,
                 feedback_metadata={
@@ -0,0 +1,384 @@
+# Micro-benchmarks for the AI Core (stdlib only).
+# Usage: python -m core.bench [rules|graph|import|ttft|decisions]
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from pathlib import Path
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+
+from .static import INTENT_KEYWORDS, URG_HIGH, URG_MED
+from .rules import scan_rules, intent_from_hits, score_urgency, keyword_intent_prior
+
+# Whisper-style transcripts: lowercase/uppercase mix, missing accents, CNP variants,
+# hesitations, repeated words and long run-on turns.
+NOISY_TRANSCRIPTS = [
+    "bonjour",
+    "allo oui",
+    "euh bonjour je voudrais euh declarer un sinistre euh accident domestique",
+    "je veux declarer un accident j'ai eu une chute dans l'escalier et j'ai une fracture",
+    "cmpa assurance c'est quoi les garanties de mon contrat",
+    "quelles sont les activités de la semp assurance",
+    "ou en est mon dossier numéro dossier 3477 ça fait longtemps pas reçu",
+    "je suis furieux c'est inadmissible mauvais service je veux faire une réclamation",
+    "mon mari est a l'hopital en soins intensifs il est dans le coma c'est urgent",
+    "Bonsoir, euh, j'aimerais parler à quelqu'un pour une information sur CNP assurance",
+    "oui oui non en fait c'est pour le pour le la brûlure de ma fille coupure au doigt",
+    "informations sur cnp " * 8,
+    "je sais pas trop c'est pour un truc euh voila",
+    "",
+]
+
+
+def legacy_score_urgency(text: str) -> str:
+    """Reference: per-pattern re.search loop (pre-compiled-matcher behaviour)."""
+    t = text.lower()
+    if any(re.search(p, t) for p in URG_HIGH):
+        return "high"
+    if any(re.search(p, t) for p in URG_MED):
+        return "med"
+    return "low"
+
+
+def legacy_keyword_intent_prior(text: str) -> Tuple[str, float]:
+    """Reference: per-pattern re.search loop (pre-compiled-matcher behaviour)."""
+    t = text.lower().strip()
+    best_intent, best_hits = "unknown", 0
+    for intent, kws in INTENT_KEYWORDS.items():
+        hits = sum(1 for kw in kws if re.search(kw, t))
+        if hits > best_hits:
+            best_intent, best_hits = intent, hits
+    strength = min(1.0, best_hits / 3.0) if best_hits > 0 else 0.0
+    return best_intent, strength
+
+
+def _legacy_turn(text: str):
+    return legacy_score_urgency(text), legacy_keyword_intent_prior(text)
+
+
+def _compiled_turn(text: str):
+    urgency, hits = scan_rules(text)
+    return urgency, intent_from_hits(hits)
+
+
+def time_per_call(fn: Callable[[str], object], texts: List[str], repeat: int) -> float:
+    """Mean microseconds per call of fn over texts, repeated `repeat` times."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            fn(t)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(texts)) * 1e6
+
+
+def check_rules_parity(texts: List[str]) -> List[str]:
+    """Return the transcripts where the compiled matcher disagrees with the legacy loop."""
+    mismatches = []
+    for t in texts:
+        if _legacy_turn(t) != _compiled_turn(t):
+            mismatches.append(t)
+        if (score_urgency(t), keyword_intent_prior(t)) != _legacy_turn(t):
+            mismatches.append(t)
+    return mismatches
+
+
+def bench_rules(repeat: int = 2000) -> Dict[str, float]:
+    mismatches = check_rules_parity(NOISY_TRANSCRIPTS)
+    if mismatches:
+        raise AssertionError(f"Compiled matcher differs from legacy rules on: {mismatches}")
+
+    legacy_us = time_per_call(_legacy_turn, NOISY_TRANSCRIPTS, repeat)
+    compiled_us = time_per_call(_compiled_turn, NOISY_TRANSCRIPTS, repeat)
+    return {
+        "turns": len(NOISY_TRANSCRIPTS),
+        "legacy_us_per_turn": round(legacy_us, 2),
+        "compiled_us_per_turn": round(compiled_us, 2),
+        "speedup": round(legacy_us / compiled_us, 2) if compiled_us else 0.0,
+    }
+
+
+def _graph_apps():
+    # Imported here so the rules suite does not need langgraph installed.
+    from .graph import build_app, build_direct_app
+    from .state import CoreState
+    graph_app = build_app(mode="rules")
+    direct_app = build_direct_app(mode="rules")
+
+    def run(app):
+        return lambda t: app.invoke(CoreState(full_text=t, emotion_bert={}, audio_summary={}))["decision"]
+    return run(graph_app), run(direct_app)
+
+
+def bench_graph(repeat: int = 200) -> Dict[str, float]:
+    """Per-turn cost of the rules pipeline through LangGraph vs the direct node chain."""
+    via_graph, direct = _graph_apps()
+    mismatches = [t for t in NOISY_TRANSCRIPTS if via_graph(t) != direct(t)]
+    if mismatches:
+        raise AssertionError(f"Direct pipeline differs from the graph on: {mismatches}")
+
+    graph_us = time_per_call(via_graph, NOISY_TRANSCRIPTS, repeat)
+    direct_us = time_per_call(direct, NOISY_TRANSCRIPTS, repeat)
+    return {
+        "turns": len(NOISY_TRANSCRIPTS),
+        "graph_us_per_turn": round(graph_us, 2),
+        "direct_us_per_turn": round(direct_us, 2),
+        "speedup": round(graph_us / direct_us, 2) if direct_us else 0.0,
+    }
+
+
+# Modules that must stay out of a plain `import core.entrypoint` (they load on first LLM use).
+HEAVY_IMPORTS = ("langgraph", "requests", "httpx", "core.prompts", "core.llm_ollama")
+
+
+def import_time_report(module: str = "core.entrypoint", top: int = 10) -> Dict[str, object]:
+    """Cold `python -X importtime -c "import <module>"` in a fresh interpreter.
+
+    Returns the total cumulative time, the slowest top-level imports and any HEAVY_IMPORTS loaded.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, check=True,
+                          cwd=Path(__file__).parent.parent.resolve())  # repo root: `core` importable
+    rows = []      # (cumulative_us, depth, name)
+    children = []  # depth-1 imports since the last top-level line: printed before their parent
+    direct = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum_us, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2  # two spaces of indent per nesting level
+        row = (int(cum_us), depth, name.strip())
+        rows.append(row)
+        if depth == 1:
+            children.append(row)
+        elif depth == 0:
+            if row[2] == module:
+                direct = children
+            children = []
+
+    target = [r for r in rows if r[1] == 0 and r[2] == module]
+    top_level = sorted(direct, reverse=True)
+    loaded = {name for _, _, name in rows}
+    return {
+        "module": module,
+        "total_ms": round(target[0][0] / 1000, 1) if target else 0.0,
+        "slowest": [(name, round(us / 1000, 1)) for us, _, name in top_level[:top]],
+        "heavy_loaded": sorted(m for m in loaded if m.split(".")[0] in HEAVY_IMPORTS or m in HEAVY_IMPORTS),
+    }
+
+
+def _stream_ttft(llm, payload: Dict[str, object]) -> Tuple[float, Dict[str, object]]:
+    """(ms to the first non-empty token, final stream event) for one /api/generate call."""
+    import json
+    start = time.perf_counter()
+    ttft, last = None, {}
+    with llm.session.post(f"{llm.base_url}/api/generate", json=payload, timeout=llm.timeout_s * 6,
+                          stream=True) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line:
+                continue
+            last = json.loads(line)
+            if ttft is None and last.get("response"):
+                ttft = (time.perf_counter() - start) * 1000
+            if last.get("done"):
+                break
+    return (ttft if ttft is not None else (time.perf_counter() - start) * 1000), last
+
+
+def bench_ttft(model: str, base_url: str = "http://localhost:11434", turns: int = 8) -> Dict[str, object]:
+    """Time-to-first-token of decision prompts against a live Ollama.
+
+    before: the whole schema/rules text inside `prompt`, model left to the server's default keep-alive
+            and unloaded first (cold start of the first call).
+    after:  static part as `system`, keep_alive set, model warmed once before the first turn.
+    """
+    from .llm_ollama import OllamaDecisionLLM
+    from .prompts import DECISION_SYSTEM_PROMPT, decision_prompt, decision_turn_prompt
+
+    texts = [t for t in NOISY_TRANSCRIPTS if t][:turns]
+    res: Dict[str, object] = {"model": model, "turns": len(texts)}
+
+    legacy = OllamaDecisionLLM(model=model, base_url=base_url, keep_alive=None)
+    legacy.session.post(f"{legacy.base_url}/api/generate", json={"model": model, "keep_alive": 0},
+                        timeout=legacy.timeout_s)  # unload: measure the cold first call
+    before = [_stream_ttft(legacy, legacy._payload(decision_prompt(t, {}, {}), 8, True)) for t in texts]
+
+    cached = OllamaDecisionLLM(model=model, base_url=base_url, system=DECISION_SYSTEM_PROMPT)
+    cached.session.post(f"{cached.base_url}/api/generate", json={"model": model, "keep_alive": 0},
+                        timeout=cached.timeout_s)
+    start = time.perf_counter()
+    cached.warmup()
+    res["warmup_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    after = [_stream_ttft(cached, cached._payload(decision_turn_prompt(t, {}, {}), 8, True)) for t in texts]
+
+    for name, runs in (("before", before), ("after", after)):
+        ttfts = [ms for ms, _ in runs]
+        res[f"{name}_first_ttft_ms"] = round(ttfts[0], 1)
+        res[f"{name}_mean_ttft_ms"] = round(sum(ttfts) / len(ttfts), 1)
+        # Ollama reports only the prompt tokens it had to evaluate (the cached prefix is skipped).
+        res[f"{name}_mean_prompt_eval_tokens"] = round(
+            sum(int(ev.get("prompt_eval_count", 0)) for _, ev in runs) / len(runs), 1)
+    return res
+
+
+DECISION_CORPUS_PATH = Path(__file__).parent.resolve() / "data" / "decision_corpus.jsonl"
+BENCH_MODES = ("rules", "embedding", "llm")
+
+
+def load_decision_corpus(path: Path = DECISION_CORPUS_PATH) -> List[Dict[str, str]]:
+    """Labeled caller turns: {id, text, intent, urgency, noise}."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _decision_runner(mode: str, ollama_url: Optional[str], model: str) -> Callable[[str], Dict[str, object]]:
+    """text -> decision, through the same direct node chain the entrypoint uses."""
+    from .graph import DirectApp, build_direct_app, node_decide_with_llm, _decision_llm
+    from .state import CoreState
+
+    if mode == "llm":
+        llm = _decision_llm(model, base_url=ollama_url)
+        app = DirectApp(lambda s: node_decide_with_llm(s, llm))
+    else:
+        app = build_direct_app(mode=mode)
+
+    def run(text: str) -> Dict[str, object]:
+        out = app.invoke(CoreState(full_text=text, emotion_bert={}, audio_summary={}))
+        return {**out["decision"], "_mode": out["debug"].get("mode")}
+    return run
+
+
+def evaluate_decisions(run: Callable[[str], Dict[str, object]], corpus: Sequence[Dict[str, str]],
+                       repeat: int = 1) -> Dict[str, object]:
+    """Throughput, latency percentiles and intent/urgency accuracy of one decision function."""
+    from .metrics import percentile
+
+    run(corpus[0]["text"])  # first call pays lazy imports / connection setup
+    latencies, intent_ok, urgency_ok, modes = [], 0, 0, {}
+    errors: Dict[str, List[str]] = {}
+    start = time.perf_counter()
+    for r in range(repeat):
+        for row in corpus:
+            t0 = time.perf_counter()
+            decision = run(row["text"])
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if r:
+                continue
+            modes[decision["_mode"]] = modes.get(decision["_mode"], 0) + 1
+            intent_ok += decision["intent"] == row["intent"]
+            urgency_ok += decision["urgency"] == row["urgency"]
+            if decision["intent"] != row["intent"]:
+                errors.setdefault(row["noise"], []).append(row["id"])
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    n = len(corpus)
+    return {
+        "turns": n,
+        "calls": len(latencies),
+        "throughput_per_s": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "intent_accuracy": round(intent_ok / n, 3),
+        "urgency_accuracy": round(urgency_ok / n, 3),
+        "modes": modes,
+        "intent_errors_by_noise": {k: len(v) for k, v in sorted(errors.items())},
+    }
+
+
+def bench_decisions(modes: Sequence[str] = BENCH_MODES, repeat: int = 5, ollama_url: Optional[str] = None,
+                    stub_latency_ms: float = 0.0, model: Optional[str] = None) -> Dict[str, Dict[str, object]]:
+    """Speed + quality per decision mode on the labeled corpus.
+
+    LLM mode targets ollama_url when given, else an in-process core.ollama_stub server
+    (rules answers, so its accuracy equals rules and its latency is the LLM plumbing only).
+    """
+    from .static import DEFAULT_OLLAMA_MODEL
+
+    corpus = load_decision_corpus()
+    results: Dict[str, Dict[str, object]] = {}
+    for mode in modes:
+        stub = None
+        try:
+            url = ollama_url
+            if mode == "llm" and not url:
+                from .ollama_stub import start_stub
+                stub, url = start_stub(latency_ms=stub_latency_ms)
+            run = _decision_runner(mode, url, model or DEFAULT_OLLAMA_MODEL)
+            # A real LLM is slow: score it once instead of `repeat` times.
+            res = evaluate_decisions(run, corpus, repeat=1 if (mode == "llm" and ollama_url) else repeat)
+            if mode == "llm":
+                res["backend"] = url if ollama_url else f"stub ({stub_latency_ms} ms)"
+            results[mode] = res
+        except Exception as e:  # missing model / offline Hugging Face / Ollama down
+            results[mode] = {"error": f"{type(e).__name__}: {e}"}
+        finally:
+            if stub is not None:
+                stub.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Core micro-benchmarks")
+    parser.add_argument("suite", nargs="?", default="rules", choices=["rules", "graph", "import", "ttft", "decisions"])
+    parser.add_argument("--repeat", type=int, default=None)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="import suite: exit non-zero above this cold import time")
+    parser.add_argument("--model", default=None, help="ttft suite: Ollama model (default DEFAULT_OLLAMA_MODEL)")
+    parser.add_argument("--ollama-url", default=None,
+                        help="ttft: Ollama to measure (default localhost); decisions: real Ollama instead of the stub")
+    parser.add_argument("--modes", default=",".join(BENCH_MODES), help="decisions suite: comma-separated modes")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="decisions suite: print JSON")
+    args = parser.parse_args()
+
+    if args.suite == "decisions":
+        res = bench_decisions([m.strip() for m in args.modes.split(",") if m.strip()],
+                              repeat=args.repeat or 5, ollama_url=args.ollama_url,
+                              stub_latency_ms=args.stub_latency_ms, model=args.model)
+        if args.json:
+            print(json.dumps(res, indent=2, ensure_ascii=False))
+            return
+        print(f"Decision modes on {DECISION_CORPUS_PATH.name}:")
+        for mode, r in res.items():
+            print(f"\n📊 {mode}")
+            for k, v in r.items():
+                print(f"   {k}: {v}")
+        return
+
+    if args.suite == "ttft":
+        from .static import DEFAULT_OLLAMA_MODEL
+        res = bench_ttft(args.model or DEFAULT_OLLAMA_MODEL, args.ollama_url or "http://localhost:11434",
+                         turns=args.repeat or 8)
+        print("Ollama decision prompts, time to first token (before: full prompt; after: system prefix + keep_alive + warmup):")
+        for k, v in res.items():
+            print(f"   {k}: {v}")
+        return
+
+    if args.suite == "import":
+        res = import_time_report()
+        print(f"Cold import of {res['module']}: {res['total_ms']} ms")
+        for name, ms in res["slowest"]:
+            print(f"   {name}: {ms} ms")
+        if res["heavy_loaded"]:
+            print(f"❌ Loaded at import time: {', '.join(res['heavy_loaded'])}")
+        if res["heavy_loaded"] or (args.budget_ms is not None and res["total_ms"] > args.budget_ms):
+            sys.exit(1)
+        return
+
+    if args.suite == "rules":
+        res = bench_rules(repeat=args.repeat or 2000)
+        print("Rules matcher (urgency + intent prior) on noisy ASR transcripts:")
+    else:
+        res = bench_graph(repeat=args.repeat or 200)
+        print("Rules-mode pipeline, LangGraph invoke vs direct node chain:")
+    for k, v in res.items():
+        print(f"   {k}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Bounded decision cache (LRU + TTL) keyed on the text as the rules see it + bucketed signals.
+# Callers repeat a small set of phrasings ("bonjour", "au revoir", ...): serving those
+# from memory skips the graph and, in LLM mode, the Ollama round trip.
+
+from typing import Any, Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+import re
+import threading
+import time
+
+from .static import SILENCE_RATIO_HIGH, CLIPPING_RATIO_HIGH
+
+# Apostrophes and hyphens carry meaning for the rules ("j'ai", "qu'est-ce"): keep them.
+_PUNCT_RE = re.compile(r"[^\w\s'’-]+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation, collapse whitespace."""
+    t = _PUNCT_RE.sub(" ", (text or "").lower().replace("’", "'"))
+    return _SPACE_RE.sub(" ", t).strip()
+
+
+def cache_key_text(text: str) -> str:
+    """Lowercase + trim, exactly what the rules match on: punctuation and spacing stay in the
+    key because the patterns see them ("allo" is a greeting, "allo." is not)."""
+    return (text or "").lower().strip()
+
+
+def decision_cache_key(full_text: str, emotion_bert: Dict[str, Any],
+                       audio_summary: Dict[str, Any]) -> Tuple[Hashable, ...]:
+    """Cache key: lowercased text + coarse emotion/audio buckets."""
+    emotion_bert = emotion_bert or {}
+    audio_summary = audio_summary or {}
+
+    sentiment = str(emotion_bert.get("sentiment", "") or "").upper()
+    score = float(emotion_bert.get("score", 0.0) or 0.0)
+    silence_ratio = float(audio_summary.get("silence_ratio", 0.0) or 0.0)
+    clipping_ratio = float(audio_summary.get("clipping_ratio", 0.0) or 0.0)
+
+    return (
+        cache_key_text(full_text),
+        sentiment,
+        min(3, int(score * 4)),                 # quartiles of the BERT score
+        silence_ratio > SILENCE_RATIO_HIGH,     # same thresholds as the rules engine
+        clipping_ratio > CLIPPING_RATIO_HIGH,
+    )
+
+
+class DecisionCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024, ttl_s: float = 3600.0):
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self._data: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, decision = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats["hits"] += 1
+        return dict(decision)
+
+    def put(self, key: Hashable, decision: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_s, dict(decision))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            for k in self.stats:
+                self.stats[k] = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.stats["hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl_s,
+                "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0,
+            }
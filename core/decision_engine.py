@@ -1,35 +1,21 @@
-\"\"\"Rules-based decision engine.\"\"\"
+"""Rules-based decision engine."""
 
 from typing import Dict, Any
-from .rules import score_urgency, keyword_intent_prior
+from .rules import scan_rules, intent_from_hits
 from .schema import validate_decision_schema
+from .static import SILENCE_RATIO_HIGH, CLIPPING_RATIO_HIGH
 
 
-def decide_rules_only(full_text: str,
-                      emotion_bert: Dict[str, Any] = None,
+def finalize_decision(intent: str, urgency: str, conf: float,
                       audio_summary: Dict[str, Any] = None) -> Dict[str, Any]:
-    \"\"\"Rules-only fallback router.\"\"\"
-    full_text = (full_text or "").strip()
-    emotion_bert = emotion_bert or {}
+    """Apply audio-quality penalties and the action policy to an (intent, urgency, confidence) guess."""
     audio_summary = audio_summary or {}
 
-    urgency = score_urgency(full_text)
-    intent, strength = keyword_intent_prior(full_text)
-    if not intent:
-        intent = "unknown"
-
-    conf = 0.60 + 0.35 * float(strength)
-    
-    if intent == "greeting":
-        conf = max(0.85, conf)
-    elif intent == "unknown":
-        conf -= 0.25
-
     silence_ratio = float(audio_summary.get("silence_ratio", 0.0) or 0.0)
     clipping_ratio = float(audio_summary.get("clipping_ratio", 0.0) or 0.0)
-    if silence_ratio > 0.60:
+    if silence_ratio > SILENCE_RATIO_HIGH:
         conf -= 0.15
-    if clipping_ratio > 0.05:
+    if clipping_ratio > CLIPPING_RATIO_HIGH:
         conf -= 0.10
 
     conf = max(0.0, min(1.0, conf))
@@ -50,3 +36,26 @@ def decide_rules_only(full_text: str,
     out = {"intent": intent, "urgency": urgency, "action": action, "confidence": round(conf, 3)}
     validate_decision_schema(out)
     return out
+
+
+def decide_rules_only(full_text: str,
+                      emotion_bert: Dict[str, Any] = None,
+                      audio_summary: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Rules-only fallback router."""
+    full_text = (full_text or "").strip()
+    emotion_bert = emotion_bert or {}
+    audio_summary = audio_summary or {}
+
+    urgency, hits = scan_rules(full_text)
+    intent, strength = intent_from_hits(hits)
+    if not intent:
+        intent = "unknown"
+
+    conf = 0.60 + 0.35 * float(strength)
+
+    if intent == "greeting":
+        conf = max(0.85, conf)
+    elif intent == "unknown":
+        conf -= 0.25
+
+    return finalize_decision(intent, urgency, conf, audio_summary)
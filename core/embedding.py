@@ -14,3 +14,9 @@ class Embedder:
     def embed_768(self, text: str) -> List[float]:
         vec = self._model.encode([text], convert_to_numpy=True, normalize_embeddings=True)[0].astype("float32")
         return vec.tolist()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """L2-normalized float32 matrix, one row per text (single batched forward pass)."""
+        vecs = self._model.encode(list(texts), batch_size=batch_size,
+                                  convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(vecs, dtype=np.float32)
@@ -1,22 +1,190 @@
 """AI Core entrypoint."""
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
-from core.graph import build_app
+import threading
+import time
+from core.graph import build_app, build_async_app, build_direct_app, warmup_llm
 from core.state import CoreState
+from core.decision_engine import decide_rules_only
+from core.cache import DecisionCache, decision_cache_key
+from core.metrics import LATENCY, elapsed_ms
 
 USE_LLM = os.environ.get("CALLBOT_USE_LLM", "false").lower() == "true"
-_APP = build_app(use_llm=USE_LLM)
+# rules | llm | hybrid | embedding | distilled (defaults to CALLBOT_USE_LLM for backward compatibility)
+DECISION_MODE = os.environ.get("CALLBOT_DECISION_MODE", "llm" if USE_LLM else "rules").lower()
+USE_LLM = DECISION_MODE in ("llm", "hybrid", "distilled")
+LLM_BUDGET_S = float(os.environ.get("CALLBOT_LLM_BUDGET_MS", "400")) / 1000.0
+DISTILLED_THRESHOLD = float(os.environ.get("CALLBOT_DISTILLED_THRESHOLD", "0.80"))
+# Run the nodes as plain calls instead of through LangGraph (default for the CPU-only modes).
+USE_FAST_PATH = os.environ.get(
+    "CALLBOT_FAST_PATH", "false" if USE_LLM else "true"
+).lower() == "true"
+BATCH_WORKERS = int(os.environ.get("CALLBOT_BATCH_WORKERS", "4"))
+# The cache pays off in LLM mode; rules mode is already microseconds, so it is opt-in there.
+USE_DECISION_CACHE = os.environ.get(
+    "CALLBOT_DECISION_CACHE", "true" if USE_LLM else "false"
+).lower() == "true"
+# Degraded answers (Ollama down or too slow) are not cached for the whole TTL.
+_UNCACHED_MODES = ("rules_fallback", "rules_deadline", "rules_saturated")
+# Built on first use (or by warmup()): importing this module must not pull in langgraph/requests.
+_APP = None
+_AAPP = None
+_APP_LOCK = threading.Lock()
+_DECISION_CACHE = DecisionCache(
+    max_size=int(os.environ.get("CALLBOT_DECISION_CACHE_SIZE", "1024")),
+    ttl_s=float(os.environ.get("CALLBOT_DECISION_CACHE_TTL_S", "3600")),
+)
 
 
-def run_ai_core(full_text: str, emotion_bert: dict, audio_summary: dict) -> Dict[str, Any]:
-    """Run AI decision engine."""
+def _get_app() -> Any:
+    global _APP
+    if _APP is None:
+        with _APP_LOCK:
+            if _APP is None:
+                builder = build_direct_app if USE_FAST_PATH else build_app
+                _APP = builder(mode=DECISION_MODE, llm_budget_s=LLM_BUDGET_S,
+                               distilled_threshold=DISTILLED_THRESHOLD)
+    return _APP
+
+
+def _get_async_app() -> Any:
+    global _AAPP
+    if _AAPP is None:
+        with _APP_LOCK:
+            if _AAPP is None:
+                _AAPP = build_async_app(mode=DECISION_MODE, llm_budget_s=LLM_BUDGET_S,
+                                        distilled_threshold=DISTILLED_THRESHOLD)
+    return _AAPP
+
+
+def _uses_async_app() -> bool:
+    return USE_LLM or not USE_FAST_PATH
+
+
+def warmup() -> None:
+    """Build the decision app(s) and warm the decision model; servers call this at startup."""
+    _get_app()
+    if _uses_async_app():
+        _get_async_app()
+    if USE_LLM:
+        # Loads the model and caches the decision system prompt on the Ollama side.
+        if not warmup_llm():
+            print("⚠️  Ollama warmup failed (server down?): first LLM decision will be slow.")
+    else:
+        # CPU-only modes: first call pays for lazy imports / model loads, not the first caller.
+        run_ai_core("bonjour", {}, {}, use_cache=False)
+
+
+def run_ai_core(full_text: str, emotion_bert: dict, audio_summary: dict,
+                use_cache: bool = True, debug: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run AI decision engine (served from the decision cache when enabled).
+
+    debug, when given, receives the graph's debug fields; debug["mode"] says which path
+    decided ("ollama_llm", "rules_only", ... or "cache_hit"), e.g. for decision logging.
+    """
+    start = time.perf_counter()
+    cached = use_cache and USE_DECISION_CACHE
+    if cached:
+        key = decision_cache_key(full_text, emotion_bert, audio_summary)
+        decision = _DECISION_CACHE.get(key)
+        if decision is not None:
+            LATENCY.observe("decision.cache_hit", elapsed_ms(start))
+            if debug is not None:
+                debug["mode"] = "cache_hit"
+            return decision
+
+    state = CoreState(
+        full_text=full_text,
+        emotion_bert=emotion_bert,
+        audio_summary=audio_summary
+    )
+    out = _get_app().invoke(state)
+    decision = out["decision"]
+    mode = out.get("debug", {}).get("mode")
+    if debug is not None:
+        debug.update(out.get("debug", {}))
+
+    if cached and mode not in _UNCACHED_MODES:
+        _DECISION_CACHE.put(key, decision)
+    LATENCY.observe(f"decision.{mode}", elapsed_ms(start))
+    return decision
+
+
+async def arun_ai_core(full_text: str, emotion_bert: dict, audio_summary: dict,
+                       use_cache: bool = True, debug: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run AI decision engine without blocking the event loop (same decision schema and debug)."""
+    start = time.perf_counter()
+    cached = use_cache and USE_DECISION_CACHE
+    if cached:
+        key = decision_cache_key(full_text, emotion_bert, audio_summary)
+        decision = _DECISION_CACHE.get(key)
+        if decision is not None:
+            LATENCY.observe("decision.cache_hit", elapsed_ms(start))
+            if debug is not None:
+                debug["mode"] = "cache_hit"
+            return decision
+
     state = CoreState(
         full_text=full_text,
         emotion_bert=emotion_bert,
         audio_summary=audio_summary
     )
-    out = _APP.invoke(state)
-    return out["decision"]
+    if _uses_async_app():
+        out = await _get_async_app().ainvoke(state)
+    elif DECISION_MODE == "rules":
+        out = _get_app().invoke(state)  # microseconds of CPU: no need to leave the event loop
+    else:
+        # embedding: a transformer forward pass per turn, kept off the event loop
+        out = await asyncio.get_running_loop().run_in_executor(None, _get_app().invoke, state)
+    decision = out["decision"]
+    mode = out.get("debug", {}).get("mode")
+    if debug is not None:
+        debug.update(out.get("debug", {}))
+
+    if cached and mode not in _UNCACHED_MODES:
+        _DECISION_CACHE.put(key, decision)
+    LATENCY.observe(f"decision.{mode}", elapsed_ms(start))
+    return decision
+
+
+def decision_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and occupancy of the decision cache."""
+    return {"enabled": USE_DECISION_CACHE, **_DECISION_CACHE.get_stats()}
+
+
+def clear_decision_cache() -> None:
+    _DECISION_CACHE.clear()
+
+
+def latency_stats() -> Dict[str, Dict[str, Any]]:
+    """p50/p95/p99 per graph node, LLM attempt and decision mode ("decision.<mode>")."""
+    return LATENCY.snapshot()
+
+
+def run_ai_core_batch(items: Iterable[Tuple[str, dict, dict]],
+                      max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Run AI decision engine on many (full_text, emotion_bert, audio_summary) triples.
 
+    Rules mode decides every item directly (same decision as the graph's rules node).
+    LLM modes fan run_ai_core out over a thread pool of max_workers
+    (default CALLBOT_BATCH_WORKERS); other modes call run_ai_core in turn.
+    In hybrid mode the pool is capped at the LLM worker pool (CALLBOT_OLLAMA_POOL_SIZE), which
+    refuses calls when full: a wider batch would push its own items to "rules_saturated".
+    Every item gets the decision run_ai_core would give it. Decisions are returned in input order.
+    """
+    items = list(items)
+    if DECISION_MODE == "rules":
+        return [decide_rules_only(text or "", emotion_bert=emotion, audio_summary=audio)
+                for text, emotion, audio in items]
+    if not USE_LLM:
+        return [run_ai_core(*item) for item in items]
 
+    workers = max(1, min(max_workers or BATCH_WORKERS, len(items) or 1))
+    if DECISION_MODE == "hybrid":
+        from core.llm_ollama import DEFAULT_POOL_SIZE
+        workers = min(workers, DEFAULT_POOL_SIZE)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda item: run_ai_core(*item), items))
@@ -1,21 +1,35 @@
-\"\"\"LangGraph orchestration of the AI Core.\"\"\"
+"""LangGraph orchestration of the AI Core."""
 
-from typing import Any, Dict
-from requests.exceptions import RequestException
-from langgraph.graph import StateGraph, END
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+import asyncio
+import threading
+import time
 
 from .state import CoreState
 from .decision_engine import decide_rules_only
-from .prompts import decision_prompt
-from .llm_ollama import OllamaDecisionLLM
 from .static import DEFAULT_OLLAMA_MODEL
+from .metrics import LATENCY, timed_node, atimed_node
+
+# langgraph, requests/httpx and the prompt module are imported where they are used, so
+# importing this module (and core.entrypoint) stays cheap for the rules-only fast path.
+if TYPE_CHECKING:
+    from .llm_ollama import OllamaDecisionLLM, AsyncOllamaDecisionLLM
+
+DECISION_MODES = ("rules", "llm", "hybrid", "embedding", "distilled")
+DEFAULT_LLM_BUDGET_S = 0.4
+# Rules decisions at or above this confidence (e.g. greetings at 0.85) skip the LLM in hybrid mode.
+DEFAULT_SKIP_LLM_CONFIDENCE = 0.85
+# Distilled-model decisions below this confidence are handed to the LLM.
+DEFAULT_DISTILLED_THRESHOLD = 0.80
 
 
 def node_preprocess(state: CoreState) -> CoreState:
-    \"\"\"Preprocess input data.\"\"\"
-    state.debug[\"text_len\"] = len(state.full_text or \"\")
-    state.debug[\"has_audio_summary\"] = bool(state.audio_summary)
-    state.debug[\"has_emotion_bert\"] = bool(state.emotion_bert)
+    """Preprocess input data."""
+    state.debug["text_len"] = len(state.full_text or "")
+    state.debug["has_audio_summary"] = bool(state.audio_summary)
+    state.debug["has_emotion_bert"] = bool(state.emotion_bert)
     return state
 
 
@@ -29,18 +43,33 @@ def node_decide_rules(state: CoreState) -> CoreState:
     return state
 
 
-def node_decide_with_llm(state: CoreState, llm: OllamaDecisionLLM) -> CoreState:
+def node_decide_with_llm(state: CoreState, llm: "OllamaDecisionLLM") -> CoreState:
     """LLM-based decision."""
-    prompt = decision_prompt(
-        full_text=state.full_text,
-        emotion_bert=state.emotion_bert,
-        audio_summary=state.audio_summary,
-    )
+    from requests.exceptions import RequestException
+
+    prompt = _llm_prompt(state, llm)
+
+    try:
+        decision = llm.decide_json(prompt, timings=state.debug.setdefault("llm_attempts_ms", {}))
+        state.debug["mode"] = "ollama_llm"
+    except (RequestException, ValueError):
+        decision = decide_rules_only(state.full_text)
+        state.debug["mode"] = "rules_fallback"
+
+    state.decision = decision
+    return state
+
+
+async def anode_decide_with_llm(state: CoreState, llm: "AsyncOllamaDecisionLLM") -> CoreState:
+    """LLM-based decision (asyncio)."""
+    import httpx
+
+    prompt = _llm_prompt(state, llm)
 
     try:
-        decision = llm.decide_json(prompt)
+        decision = await llm.decide_json(prompt, timings=state.debug.setdefault("llm_attempts_ms", {}))
         state.debug["mode"] = "ollama_llm"
-    except RequestException:
+    except (httpx.HTTPError, ValueError):
         decision = decide_rules_only(state.full_text)
         state.debug["mode"] = "rules_fallback"
 
@@ -48,6 +77,170 @@ def node_decide_with_llm(state: CoreState, llm: OllamaDecisionLLM) -> CoreState:
     return state
 
 
+def node_decide_embedding(state: CoreState, classifier: Any) -> CoreState:
+    """Embedding nearest-centroid decision."""
+    from .intent_centroids import decide_embedding
+
+    state.decision = decide_embedding(state.full_text or "", classifier,
+                                      emotion_bert=state.emotion_bert,
+                                      audio_summary=state.audio_summary)
+    state.debug["mode"] = "embedding_centroid"
+    return state
+
+
+def node_decide_distilled(state: CoreState, model: Any, llm: "OllamaDecisionLLM",
+                          threshold: float = DEFAULT_DISTILLED_THRESHOLD) -> CoreState:
+    """Distilled local model; the LLM is consulted only below threshold."""
+    decision = model.decide(state.full_text or "", audio_summary=state.audio_summary)
+    state.debug["distilled_confidence"] = decision["confidence"]
+    if decision["confidence"] >= threshold:
+        state.decision = decision
+        state.debug["mode"] = "distilled"
+        return state
+    return node_decide_with_llm(state, llm)
+
+
+async def anode_decide_distilled(state: CoreState, model: Any, llm: "AsyncOllamaDecisionLLM",
+                                 threshold: float = DEFAULT_DISTILLED_THRESHOLD) -> CoreState:
+    """Distilled local model (asyncio); the LLM is awaited only below threshold."""
+    decision = model.decide(state.full_text or "", audio_summary=state.audio_summary)
+    state.debug["distilled_confidence"] = decision["confidence"]
+    if decision["confidence"] >= threshold:
+        state.decision = decision
+        state.debug["mode"] = "distilled"
+        return state
+    return await anode_decide_with_llm(state, llm)
+
+
+def _llm_prompt(state: CoreState, llm: Any) -> str:
+    """Turn-only prompt when the client sends the static part as its system prompt."""
+    from .prompts import decision_prompt, decision_turn_prompt
+
+    build = decision_turn_prompt if llm.system else decision_prompt
+    return build(state.full_text, state.emotion_bert, state.audio_summary)
+
+
+def _rules_decision(state: CoreState) -> Dict[str, Any]:
+    return decide_rules_only(state.full_text or "",
+                             emotion_bert=state.emotion_bert,
+                             audio_summary=state.audio_summary)
+
+
+class LLMWorkerPool:
+    """Thread pool for hybrid-mode LLM calls that never queues: a call is refused when every worker is busy."""
+
+    def __init__(self, size: int):
+        self._pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix="llm-hybrid")
+        self._free = threading.BoundedSemaphore(size)
+
+    def try_submit(self, fn: Callable[..., Any], *args: Any) -> Optional[Future]:
+        """Future of fn(*args), or None when no worker is free."""
+        if not self._free.acquire(blocking=False):
+            return None
+
+        def run() -> Any:
+            # Released before the result is set: whoever waits on it can submit again at once.
+            try:
+                return fn(*args)
+            finally:
+                self._free.release()
+
+        try:
+            return self._pool.submit(run)
+        except BaseException:
+            self._free.release()
+            raise
+
+
+def node_decide_hybrid(state: CoreState, llm: "OllamaDecisionLLM", pool: LLMWorkerPool,
+                       budget_s: float = DEFAULT_LLM_BUDGET_S,
+                       skip_llm_confidence: float = DEFAULT_SKIP_LLM_CONFIDENCE) -> CoreState:
+    """Rules decision right away, LLM in parallel; the LLM answer wins only if valid within budget_s.
+
+    The LLM request itself is bounded by what is left of budget_s when a worker picks it up,
+    so an abandoned call frees its worker at the deadline. With every worker busy the turn
+    is decided by rules at once ("rules_saturated"). Queue wait and LLM time are reported apart.
+    """
+    from requests.exceptions import RequestException, Timeout
+
+    start = time.monotonic()
+    rules = _rules_decision(state)
+    state.debug["llm_budget_ms"] = round(budget_s * 1000)
+
+    if budget_s <= 0 or rules["confidence"] >= skip_llm_confidence:
+        state.decision = rules
+        state.debug["mode"] = "rules_confident" if budget_s > 0 else "rules_only"
+        return state
+
+    prompt = _llm_prompt(state, llm)
+    deadline = start + budget_s
+    submitted = time.monotonic()
+    # The worker may outlive this turn (deadline), so it writes into its own dicts.
+    attempts: Dict[str, float] = {}
+    queue: Dict[str, float] = {}
+
+    def call() -> Dict[str, Any]:
+        picked_up = time.monotonic()
+        queue["ms"] = (picked_up - submitted) * 1000
+        LATENCY.observe("llm.queue", queue["ms"])
+        return llm.decide_json(prompt, attempts, timeout_s=deadline - picked_up)
+
+    future = pool.try_submit(call)
+    if future is None:
+        state.decision = rules
+        state.debug["mode"] = "rules_saturated"
+        return state
+    try:
+        decision = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        state.debug["mode"] = "ollama_llm"
+        state.debug["llm_ms"] = round((time.monotonic() - submitted) * 1000 - queue.get("ms", 0.0), 1)
+    except (FutureTimeoutError, Timeout):
+        # The worker's own request times out at the same deadline and frees the worker.
+        decision = rules
+        state.debug["mode"] = "rules_deadline"
+    except (RequestException, ValueError):
+        decision = rules
+        state.debug["mode"] = "rules_fallback"
+    if "ms" in queue:
+        state.debug["llm_queue_ms"] = round(queue["ms"], 1)
+    state.debug["llm_attempts_ms"] = dict(attempts)
+
+    state.decision = decision
+    return state
+
+
+async def anode_decide_hybrid(state: CoreState, llm: "AsyncOllamaDecisionLLM",
+                              budget_s: float = DEFAULT_LLM_BUDGET_S,
+                              skip_llm_confidence: float = DEFAULT_SKIP_LLM_CONFIDENCE) -> CoreState:
+    """Hybrid decision (asyncio): the LLM request is cancelled once the budget is spent."""
+    import httpx
+
+    start = time.monotonic()
+    rules = _rules_decision(state)
+    state.debug["llm_budget_ms"] = round(budget_s * 1000)
+
+    if budget_s <= 0 or rules["confidence"] >= skip_llm_confidence:
+        state.decision = rules
+        state.debug["mode"] = "rules_confident" if budget_s > 0 else "rules_only"
+        return state
+
+    prompt = _llm_prompt(state, llm)
+    try:
+        decision = await asyncio.wait_for(
+            llm.decide_json(prompt, timings=state.debug.setdefault("llm_attempts_ms", {})), timeout=budget_s)
+        state.debug["mode"] = "ollama_llm"
+        state.debug["llm_ms"] = round((time.monotonic() - start) * 1000, 1)
+    except asyncio.TimeoutError:
+        decision = rules
+        state.debug["mode"] = "rules_deadline"
+    except (httpx.HTTPError, ValueError):
+        decision = rules
+        state.debug["mode"] = "rules_fallback"
+
+    state.decision = decision
+    return state
+
+
 def node_feedback_stub(state: CoreState) -> CoreState:
     """Feedback placeholder."""
     state.debug["feedback_placeholder"] = {
@@ -56,21 +249,161 @@ def node_feedback_stub(state: CoreState) -> CoreState:
     return state
 
 
-def build_app(use_llm: bool = True, ollama_model: str = DEFAULT_OLLAMA_MODEL) -> Any:
+def _resolve_mode(use_llm: bool, mode: Optional[str]) -> str:
+    mode = mode or ("llm" if use_llm else "rules")
+    if mode not in DECISION_MODES:
+        raise ValueError(f"Unknown decision mode {mode!r}, expected one of {DECISION_MODES}.")
+    return mode
+
+
+def _decision_llm(ollama_model: str, asynchronous: bool = False, base_url: Optional[str] = None) -> Any:
+    """Ollama client with the static decision instructions as its (cached) system prompt."""
+    from .prompts import DECISION_SYSTEM_PROMPT
+    from .llm_ollama import OllamaDecisionLLM, AsyncOllamaDecisionLLM
+
+    cls = AsyncOllamaDecisionLLM if asynchronous else OllamaDecisionLLM
+    kwargs = {"base_url": base_url} if base_url else {}
+    return cls(model=ollama_model, system=DECISION_SYSTEM_PROMPT, **kwargs)
+
+
+def warmup_llm(ollama_model: str = DEFAULT_OLLAMA_MODEL) -> bool:
+    """Load ollama_model and evaluate the decision system prompt once (False if Ollama is unreachable)."""
+    return _decision_llm(ollama_model).warmup()
+
+
+@lru_cache(maxsize=None)
+def _shared_classifier() -> Any:
+    """One centroid classifier per process, whichever app(s) get built."""
+    from .intent_centroids import CentroidIntentClassifier
+    return CentroidIntentClassifier()
+
+
+@lru_cache(maxsize=None)
+def _shared_distilled_model() -> Any:
+    from .distill import DistilledDecisionModel
+    return DistilledDecisionModel.load()
+
+
+def _decide_node(mode: str, ollama_model: str, llm_budget_s: float,
+                 skip_llm_confidence: float, distilled_threshold: float) -> Callable[[CoreState], CoreState]:
+    """Synchronous "decide" node for mode."""
+    if mode == "llm":
+        llm = _decision_llm(ollama_model)
+        return lambda s: node_decide_with_llm(s, llm)
+    if mode == "hybrid":
+        llm = _decision_llm(ollama_model)
+        pool = LLMWorkerPool(llm.pool_size)
+        return lambda s: node_decide_hybrid(s, llm, pool, llm_budget_s, skip_llm_confidence)
+    if mode == "embedding":
+        classifier = _shared_classifier()
+        return lambda s: node_decide_embedding(s, classifier)
+    if mode == "distilled":
+        model = _shared_distilled_model()
+        llm = _decision_llm(ollama_model)
+        return lambda s: node_decide_distilled(s, model, llm, distilled_threshold)
+    return node_decide_rules
+
+
+def build_app(use_llm: bool = True, ollama_model: str = DEFAULT_OLLAMA_MODEL,
+              mode: Optional[str] = None, llm_budget_s: float = DEFAULT_LLM_BUDGET_S,
+              skip_llm_confidence: float = DEFAULT_SKIP_LLM_CONFIDENCE,
+              distilled_threshold: float = DEFAULT_DISTILLED_THRESHOLD) -> Any:
+    """Compile the core graph. mode overrides use_llm: one of DECISION_MODES."""
+    from langgraph.graph import StateGraph, END
+
+    mode = _resolve_mode(use_llm, mode)
     g = StateGraph(CoreState)
-    g.add_node("preprocess", node_preprocess)
+    g.add_node("preprocess", timed_node("preprocess", node_preprocess))
+    g.add_node("decide", timed_node("decide", _decide_node(mode, ollama_model, llm_budget_s,
+                                                           skip_llm_confidence, distilled_threshold)))
+    g.add_node("feedback", timed_node("feedback", node_feedback_stub))
+
+    g.set_entry_point("preprocess")
+    g.add_edge("preprocess", "decide")
+    g.add_edge("decide", "feedback")
+    g.add_edge("feedback", END)
+
+    return g.compile()
+
+
+class DirectApp:
+    """preprocess -> decide -> feedback as plain calls: same nodes, no LangGraph channels/copies.
+
+    invoke() mirrors the compiled graph: it returns the final state fields as a dict.
+    """
+
+    def __init__(self, decide: Callable[[CoreState], CoreState]):
+        self.nodes = (timed_node("preprocess", node_preprocess),
+                      timed_node("decide", decide),
+                      timed_node("feedback", node_feedback_stub))
+
+    def invoke(self, state: CoreState) -> Dict[str, Any]:
+        for node in self.nodes:
+            state = node(state)
+        return vars(state)
+
+
+def build_direct_app(use_llm: bool = True, ollama_model: str = DEFAULT_OLLAMA_MODEL,
+                     mode: Optional[str] = None, llm_budget_s: float = DEFAULT_LLM_BUDGET_S,
+                     skip_llm_confidence: float = DEFAULT_SKIP_LLM_CONFIDENCE,
+                     distilled_threshold: float = DEFAULT_DISTILLED_THRESHOLD) -> DirectApp:
+    """Fast path with the same signature as build_app, for when the graph's extensibility isn't needed."""
+    mode = _resolve_mode(use_llm, mode)
+    return DirectApp(_decide_node(mode, ollama_model, llm_budget_s,
+                                  skip_llm_confidence, distilled_threshold))
+
+
+def build_async_app(use_llm: bool = True, ollama_model: str = DEFAULT_OLLAMA_MODEL,
+                    mode: Optional[str] = None, llm_budget_s: float = DEFAULT_LLM_BUDGET_S,
+                    skip_llm_confidence: float = DEFAULT_SKIP_LLM_CONFIDENCE,
+                    distilled_threshold: float = DEFAULT_DISTILLED_THRESHOLD) -> Any:
+    """Same graph as build_app, for ainvoke(): the LLM node awaits an async HTTP client."""
+    from langgraph.graph import StateGraph, END
+
+    mode = _resolve_mode(use_llm, mode)
+    g = StateGraph(CoreState)
+
+    # Cheap CPU-only nodes stay synchronous inside coroutines (no thread hop).
+    async def preprocess(s: CoreState) -> CoreState:
+        return node_preprocess(s)
+
+    async def feedback(s: CoreState) -> CoreState:
+        return node_feedback_stub(s)
+
+    g.add_node("preprocess", atimed_node("preprocess", preprocess))
+
+    if mode == "llm":
+        llm = _decision_llm(ollama_model, asynchronous=True)
+
+        async def decide(s: CoreState) -> CoreState:
+            return await anode_decide_with_llm(s, llm)
+    elif mode == "hybrid":
+        llm = _decision_llm(ollama_model, asynchronous=True)
+
+        async def decide(s: CoreState) -> CoreState:
+            return await anode_decide_hybrid(s, llm, llm_budget_s, skip_llm_confidence)
+    elif mode == "embedding":
+        classifier = _shared_classifier()
+
+        async def decide(s: CoreState) -> CoreState:
+            # transformer forward pass: run it in a thread, not on the event loop
+            return await asyncio.get_running_loop().run_in_executor(None, node_decide_embedding, s, classifier)
+    elif mode == "distilled":
+        model = _shared_distilled_model()
+        llm = _decision_llm(ollama_model, asynchronous=True)
 
-    if use_llm:
-        llm = OllamaDecisionLLM(model=ollama_model)
-        g.add_node("decide", lambda s: node_decide_with_llm(s, llm))
+        async def decide(s: CoreState) -> CoreState:
+            return await anode_decide_distilled(s, model, llm, distilled_threshold)
     else:
-        g.add_node("decide", node_decide_rules)
+        async def decide(s: CoreState) -> CoreState:
+            return node_decide_rules(s)
 
-    g.add_node("feedback", node_feedback_stub)
+    g.add_node("decide", atimed_node("decide", decide))
+    g.add_node("feedback", atimed_node("feedback", feedback))
 
     g.set_entry_point("preprocess")
     g.add_edge("preprocess", "decide")
     g.add_edge("decide", "feedback")
     g.add_edge("feedback", END)
 
-    return g.compile()
\ No newline at end of file
+    return g.compile()
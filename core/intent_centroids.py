@@ -0,0 +1,105 @@
+# Nearest-centroid intent classifier on top of core.embedding.Embedder.
+# One normalized centroid per intent is computed from INTENT_EXAMPLES and cached on disk;
+# a turn is classified with one dot product against the centroid matrix, and the margin
+# between the two best scores gives the confidence. No Ollama needed, a few ms on CPU.
+
+from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import json
+import numpy as np
+
+from .static import INTENT_EXAMPLES, DEFAULT_EMBED_MODEL
+from .rules import score_urgency
+from .decision_engine import finalize_decision
+
+ARTIFACTS_DIR = Path(__file__).parent.resolve() / "artifacts"
+DEFAULT_CENTROIDS_PATH = ARTIFACTS_DIR / "intent_centroids.npz"
+
+
+def _examples_key(model_name: str, examples: Dict[str, List[str]]) -> str:
+    blob = json.dumps({"model": model_name, "examples": examples}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class CentroidIntentClassifier:
+    """Cosine nearest-centroid classifier; confidence = scaled top-1/top-2 margin."""
+
+    def __init__(self, embedder: Any = None,
+                 examples: Dict[str, List[str]] = INTENT_EXAMPLES,
+                 cache_path: Optional[Path] = DEFAULT_CENTROIDS_PATH,
+                 margin_full: float = 0.25,
+                 min_similarity: float = 0.30):
+        if embedder is None:
+            from .embedding import Embedder
+            embedder = Embedder(DEFAULT_EMBED_MODEL)
+        self.embedder = embedder
+        self.margin_full = margin_full          # margin at which confidence reaches 1.0
+        self.min_similarity = min_similarity    # below this, the turn is "unknown"
+
+        examples = {k: v for k, v in examples.items() if v}
+        key = _examples_key(embedder.model_name, examples)
+        loaded = self._load(cache_path, key) if cache_path else None
+        if loaded is None:
+            self.intents, self.centroids = self._fit(examples)
+            if cache_path:
+                self._save(cache_path, key)
+        else:
+            self.intents, self.centroids = loaded
+
+    def _fit(self, examples: Dict[str, List[str]]) -> Tuple[List[str], np.ndarray]:
+        intents = list(examples)
+        texts = [t for i in intents for t in examples[i]]
+        vecs = self.embedder.encode(texts)  # one batched pass over every example
+        centroids, row = [], 0
+        for intent in intents:
+            n = len(examples[intent])
+            c = vecs[row:row + n].mean(axis=0)
+            centroids.append(c / (np.linalg.norm(c) + 1e-12))
+            row += n
+        return intents, np.vstack(centroids).astype(np.float32)
+
+    @staticmethod
+    def _load(path: Path, key: str) -> Optional[Tuple[List[str], np.ndarray]]:
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            data = np.load(path, allow_pickle=False)
+            if str(data["key"]) != key:
+                return None
+            return [str(i) for i in data["intents"]], data["centroids"].astype(np.float32)
+        except Exception:
+            return None
+
+    def _save(self, path: Path, key: str) -> None:
+        path = Path(path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(path, key=np.array(key), intents=np.array(self.intents), centroids=self.centroids)
+        except OSError as e:
+            print(f"⚠️  Centroid cache save error: {e}")
+
+    def scores(self, text: str) -> np.ndarray:
+        q = self.embedder.encode([text or ""])[0]
+        return self.centroids @ q
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """Return (intent, confidence 0..1)."""
+        s = self.scores(text)
+        order = np.argsort(s)[::-1]
+        top = float(s[order[0]])
+        second = float(s[order[1]]) if len(order) > 1 else 0.0
+        if top < self.min_similarity:
+            return "unknown", 0.0
+        conf = min(1.0, max(0.0, (top - second) / self.margin_full))
+        return self.intents[int(order[0])], conf
+
+
+def decide_embedding(full_text: str, classifier: CentroidIntentClassifier,
+                     emotion_bert: Dict[str, Any] = None,
+                     audio_summary: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Embedding-mode router: centroid intent + rules urgency + the rules action policy."""
+    full_text = (full_text or "").strip()
+    intent, conf = classifier.classify(full_text)
+    return finalize_decision(intent, score_urgency(full_text), conf, audio_summary)
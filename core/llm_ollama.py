@@ -1,53 +1,126 @@
 # Ollama client for decision JSON generation.
 # Uses short prompts, strict JSON parsing, and one repair attempt.
+# One pooled keep-alive session per client. In streaming mode the token stream is
+# scanned as it arrives and the generation is cancelled (stream closed) as soon as
+# a balanced {...} object validates, instead of waiting for the num_predict budget.
+# AsyncOllamaDecisionLLM is the same client on httpx.AsyncClient for the FastAPI servers.
+# The static instructions go in `system` (identical bytes every call) and the model is kept
+# loaded with `keep_alive`, so Ollama reuses the evaluated prefix and only processes the turn.
+# Each HTTP attempt (stream / generate / repair) is timed into core.metrics.LATENCY as "llm.<attempt>".
+# decide_json(timeout_s=...) bounds all attempts of one decision together: each HTTP call gets
+# what is left of it, so a caller's deadline also ends the request (hybrid mode).
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import json
+import os
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from .schema import validate_decision_schema
+from .metrics import LATENCY
 
-class OllamaDecisionLLM:
-    def __init__(self, model: str, base_url: str = "http://localhost:11434", timeout_s: float = 10):
+DEFAULT_OLLAMA_URL = os.environ.get("CALLBOT_OLLAMA_URL", "http://localhost:11434")
+# How long Ollama keeps the model (and its prompt cache) in memory after a request.
+DEFAULT_KEEP_ALIVE = os.environ.get("CALLBOT_OLLAMA_KEEP_ALIVE", "30m")
+# Concurrent requests per client (keep-alive connections; hybrid-mode LLM workers).
+DEFAULT_POOL_SIZE = int(os.environ.get("CALLBOT_OLLAMA_POOL_SIZE", "4"))
+
+
+class JsonObjectScanner:
+    """Incremental scanner returning each top-level balanced {...} block as it closes."""
+
+    def __init__(self):
+        self.buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._start = -1
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[str]:
+        self.buf += chunk
+        done = []
+        buf = self.buf
+        for i in range(self._pos, len(buf)):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif c == "{":
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif c == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    done.append(buf[self._start:i + 1])
+        self._pos = len(buf)
+        return done
+
+
+class _OllamaDecisionBase:
+    """Config, payloads and parsing shared by the sync and async clients."""
+
+    def __init__(self, model: str, base_url: str = DEFAULT_OLLAMA_URL, timeout_s: float = 10,
+                 stream: bool = True, pool_size: int = DEFAULT_POOL_SIZE, system: Optional[str] = None,
+                 keep_alive: Optional[str] = DEFAULT_KEEP_ALIVE):
         self.model = model
         self.base_url = base_url.rstrip("/")
         self.timeout_s = timeout_s
+        self.stream = stream
+        self.pool_size = pool_size
+        self.system = system            # static prefix, sent with every decision prompt
+        self.keep_alive = keep_alive
 
-    def _generate(self, prompt: str, max_tokens: int = 120) -> str:
-        url = f"{self.base_url}/api/generate"
+    def _payload(self, prompt: str, max_tokens: int, stream: bool, system: bool = True) -> Dict[str, Any]:
         payload = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "num_predict": max_tokens,
                 "temperature": 0.1,  # stable JSON
                 "top_p": 0.9,
             }
         }
-        r = requests.post(url, json=payload, timeout=self.timeout_s)
-        r.raise_for_status()
-        return r.json().get("response", "")
+        if system and self.system:
+            payload["system"] = self.system
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
 
-    def decide_json(self, prompt: str) -> Dict[str, Any]:
-        # Attempt 1
-        txt = self._generate(prompt)
-        obj = self._try_parse(txt)
-        if obj is not None:
-            validate_decision_schema(obj)
-            return obj
+    def _warmup_payload(self) -> Dict[str, Any]:
+        # One token is enough to load the weights and evaluate (cache) the system prefix.
+        return self._payload("bonjour", 1, False)
 
+    @staticmethod
+    def _repair_prompt(txt: str) -> str:
         # Repair attempt (keep it short)
-        repair_prompt = (
+        return (
             "Corrige la sortie suivante pour qu'elle soit UNIQUEMENT un JSON valide "
             "avec EXACTEMENT les clés intent, urgency, action, confidence, et rien d'autre.\n"
             f"SORTIE À CORRIGER:\n{txt}\nJSON:"
         )
-        txt2 = self._generate(repair_prompt, max_tokens=140)
-        obj2 = self._try_parse(txt2)
-        if obj2 is None:
-            raise ValueError("LLM output is not parseable JSON after repair.")
-        validate_decision_schema(obj2)
-        return obj2
+
+    @classmethod
+    def _first_valid(cls, blocks: List[str]) -> Optional[Dict[str, Any]]:
+        for block in blocks:
+            obj = cls._try_parse(block)
+            if obj is None:
+                continue
+            try:
+                validate_decision_schema(obj)
+            except ValueError:
+                continue
+            return obj
+        return None
 
     @staticmethod
     def _try_parse(text: str) -> Optional[Dict[str, Any]]:
@@ -63,3 +136,183 @@ class OllamaDecisionLLM:
             return json.loads(t)
         except Exception:
             return None
+
+
+class OllamaDecisionLLM(_OllamaDecisionBase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Persistent keep-alive connections (one pool shared by all threads).
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout("Ollama decision exceeded its time budget.")
+        return remaining
+
+    def _generate(self, prompt: str, max_tokens: int = 120, system: bool = True,
+                  deadline: Optional[float] = None) -> str:
+        url = f"{self.base_url}/api/generate"
+        timeout = self.timeout_s if deadline is None else self._remaining(deadline)
+        r = self.session.post(url, json=self._payload(prompt, max_tokens, False, system), timeout=timeout)
+        r.raise_for_status()
+        return r.json().get("response", "")
+
+    def warmup(self, timeout_s: float = 120) -> bool:
+        """Load the model and its system prefix so the first caller does not pay for it."""
+        try:
+            r = self.session.post(f"{self.base_url}/api/generate", json=self._warmup_payload(), timeout=timeout_s)
+            r.raise_for_status()
+            return True
+        except requests.exceptions.RequestException:
+            return False
+
+    def _generate_stream_decision(self, prompt: str, max_tokens: int = 120,
+                                  deadline: Optional[float] = None) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Stream tokens until a valid decision object closes.
+
+        Returns (decision or None, text received so far).
+        """
+        url = f"{self.base_url}/api/generate"
+        if deadline is None:
+            deadline = time.monotonic() + self.timeout_s
+        scanner = JsonObjectScanner()
+
+        # Closing the response early drops the connection, which makes Ollama abort the generation.
+        with self.session.post(url, json=self._payload(prompt, max_tokens, True),
+                               timeout=self._remaining(deadline), stream=True) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                if time.monotonic() > deadline:
+                    raise requests.exceptions.Timeout("Ollama stream exceeded timeout.")
+                event = json.loads(line)
+                obj = self._first_valid(scanner.feed(event.get("response", "")))
+                if obj is not None:
+                    return obj, scanner.buf
+                if event.get("done"):
+                    break
+        return None, scanner.buf
+
+    def decide_json(self, prompt: str, timings: Optional[Dict[str, float]] = None,
+                    timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        """Decision dict; per-attempt milliseconds are written into timings when given.
+
+        timeout_s (default: the client timeout) covers every attempt: past it,
+        requests.exceptions.Timeout is raised and no further request is sent.
+        """
+        deadline = time.monotonic() + (self.timeout_s if timeout_s is None else timeout_s)
+        # Attempt 1
+        if self.stream:
+            with LATENCY.timer("llm.stream", timings, "stream"):
+                obj, txt = self._generate_stream_decision(prompt, deadline=deadline)
+            if obj is not None:
+                return obj
+        else:
+            with LATENCY.timer("llm.generate", timings, "generate"):
+                txt = self._generate(prompt, deadline=deadline)
+        obj = self._try_parse(txt)
+        if obj is not None:
+            validate_decision_schema(obj)
+            return obj
+
+        with LATENCY.timer("llm.repair", timings, "repair"):
+            txt2 = self._generate(self._repair_prompt(txt), max_tokens=140, system=False, deadline=deadline)
+        obj2 = self._try_parse(txt2)
+        if obj2 is None:
+            raise ValueError("LLM output is not parseable JSON after repair.")
+        validate_decision_schema(obj2)
+        return obj2
+
+
+class AsyncOllamaDecisionLLM(_OllamaDecisionBase):
+    """asyncio variant (httpx.AsyncClient): concurrent decisions overlap their LLM waits."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                limits=httpx.Limits(max_keepalive_connections=self.pool_size),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _generate(self, prompt: str, max_tokens: int = 120, system: bool = True) -> str:
+        url = f"{self.base_url}/api/generate"
+        r = await self._get_client().post(url, json=self._payload(prompt, max_tokens, False, system))
+        r.raise_for_status()
+        return r.json().get("response", "")
+
+    async def warmup(self, timeout_s: float = 120) -> bool:
+        """Load the model and its system prefix so the first caller does not pay for it."""
+        import httpx
+        try:
+            r = await self._get_client().post(f"{self.base_url}/api/generate",
+                                              json=self._warmup_payload(), timeout=timeout_s)
+            r.raise_for_status()
+            return True
+        except httpx.HTTPError:
+            return False
+
+    async def _generate_stream_decision(self, prompt: str, max_tokens: int = 120) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Stream tokens until a valid decision object closes.
+
+        Returns (decision or None, text received so far).
+        """
+        import httpx
+        url = f"{self.base_url}/api/generate"
+        deadline = time.monotonic() + self.timeout_s
+        scanner = JsonObjectScanner()
+
+        async with self._get_client().stream("POST", url, json=self._payload(prompt, max_tokens, True)) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if not line:
+                    continue
+                if time.monotonic() > deadline:
+                    raise httpx.ReadTimeout("Ollama stream exceeded timeout.")
+                event = json.loads(line)
+                obj = self._first_valid(scanner.feed(event.get("response", "")))
+                if obj is not None:
+                    return obj, scanner.buf
+                if event.get("done"):
+                    break
+        return None, scanner.buf
+
+    async def decide_json(self, prompt: str, timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Decision dict; per-attempt milliseconds are written into timings when given."""
+        # Attempt 1
+        if self.stream:
+            with LATENCY.timer("llm.stream", timings, "stream"):
+                obj, txt = await self._generate_stream_decision(prompt)
+            if obj is not None:
+                return obj
+        else:
+            with LATENCY.timer("llm.generate", timings, "generate"):
+                txt = await self._generate(prompt)
+        obj = self._try_parse(txt)
+        if obj is not None:
+            validate_decision_schema(obj)
+            return obj
+
+        with LATENCY.timer("llm.repair", timings, "repair"):
+            txt2 = await self._generate(self._repair_prompt(txt), max_tokens=140, system=False)
+        obj2 = self._try_parse(txt2)
+        if obj2 is None:
+            raise ValueError("LLM output is not parseable JSON after repair.")
+        validate_decision_schema(obj2)
+        return obj2
@@ -0,0 +1,116 @@
+# In-process latency histograms for the AI Core.
+# Nodes, LLM attempts and whole decisions report milliseconds (time.perf_counter, monotonic)
+# under a dotted name, e.g. "node.decide", "llm.stream", "decision.ollama_llm".
+# Each name keeps running totals plus a bounded window of recent samples for p50/p95/p99,
+# so memory stays flat on a long-running server. Exposed by app/twilio_server.py.
+
+from typing import Any, Callable, Dict, Optional
+from collections import deque
+from contextlib import contextmanager
+import math
+import threading
+import time
+
+
+def percentile(sorted_samples, q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of an already sorted sequence."""
+    if not sorted_samples:
+        return 0.0
+    rank = min(len(sorted_samples), max(1, math.ceil(q / 100.0 * len(sorted_samples))))
+    return float(sorted_samples[rank - 1])
+
+
+class LatencyHistogram:
+    """count/sum/max since start + the last `window` samples for percentiles."""
+
+    def __init__(self, window: int = 2048):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def summary(self) -> Dict[str, Any]:
+        s = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": round(percentile(s, 50), 3),
+            "p95_ms": round(percentile(s, 95), 3),
+            "p99_ms": round(percentile(s, 99), 3),
+        }
+
+
+class LatencyRegistry:
+    """Thread-safe name -> LatencyHistogram map."""
+
+    def __init__(self, window: int = 2048):
+        self.window = window
+        self._hists: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, ms: float) -> None:
+        with self._lock:
+            hist = self._hists.get(name)
+            if hist is None:
+                hist = self._hists[name] = LatencyHistogram(self.window)
+            hist.observe(ms)
+
+    @contextmanager
+    def timer(self, name: str, sink: Optional[Dict[str, float]] = None, key: Optional[str] = None):
+        """Time the block into `name` (and into sink[key] when a per-request dict is given)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.observe(name, ms)
+            if sink is not None:
+                sink[key or name] = round(ms, 3)
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: h.summary() for name, h in sorted(self._hists.items()) if name.startswith(prefix)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hists.clear()
+
+
+LATENCY = LatencyRegistry()
+
+
+def elapsed_ms(start: float) -> float:
+    """Milliseconds since a time.perf_counter() reading."""
+    return (time.perf_counter() - start) * 1000
+
+
+def timed_node(name: str, fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Wrap a graph node: its duration goes to state.debug["timings_ms"][name] and "node.<name>"."""
+    def run(state):
+        start = time.perf_counter()
+        state = fn(state)
+        ms = elapsed_ms(start)
+        state.debug.setdefault("timings_ms", {})[name] = round(ms, 3)
+        LATENCY.observe(f"node.{name}", ms)
+        return state
+    return run
+
+
+def atimed_node(name: str, fn: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """timed_node for coroutine nodes."""
+    async def run(state):
+        start = time.perf_counter()
+        state = await fn(state)
+        ms = elapsed_ms(start)
+        state.debug.setdefault("timings_ms", {})[name] = round(ms, 3)
+        LATENCY.observe(f"node.{name}", ms)
+        return state
+    return run
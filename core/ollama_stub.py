@@ -0,0 +1,73 @@
+# Local stand-in for Ollama's /api/generate, for benchmarks without a model.
+# It answers with the rules decision for the transcript found in the prompt (so accuracy
+# equals the rules engine) after a configurable delay, streamed as NDJSON like Ollama does.
+# What it measures is the LLM path's own cost: HTTP, streaming scan, parsing, validation.
+#
+# Usage: python -m core.ollama_stub [--port 11435] [--latency-ms 40]
+
+from typing import Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import re
+import threading
+import time
+
+from .decision_engine import decide_rules_only
+
+_TRANSCRIPT = re.compile(r'"""(.*?)"""', re.S)
+
+
+def stub_response(prompt: str) -> str:
+    m = _TRANSCRIPT.search(prompt or "")
+    return json.dumps(decide_rules_only(m.group(1) if m else ""), ensure_ascii=False)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"
+    latency_s = 0.0
+    chunk_chars = 8
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.latency_s)
+        out = stub_response(body.get("prompt", ""))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        if not body.get("stream"):
+            self.wfile.write(json.dumps({"response": out, "done": True}).encode("utf-8"))
+            return
+        for i in range(0, len(out), self.chunk_chars):
+            self.wfile.write((json.dumps({"response": out[i:i + self.chunk_chars], "done": False}) + "\n").encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b'{"response": "", "done": true}\n')
+
+
+def start_stub(port: int = 0, latency_ms: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve in a daemon thread; returns (server, base_url). Stop with server.shutdown()."""
+    handler = type("StubHandler", (_Handler,), {"latency_s": latency_ms / 1000.0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Ollama /api/generate stub")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    server, url = start_stub(args.port, args.latency_ms)
+    print(f"🧪 Ollama stub on {url} (latency {args.latency_ms} ms)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,11 @@
 # Prompts are isolated for easier iteration.
 # This is designed for "JSON only" decision output.
+# The static schema/rules text is the system prompt: it is byte-identical on every call,
+# so Ollama keeps its evaluated KV prefix for the loaded model and only the turn is new work.
 
 from .static import INTENTS, ALLOWED_URGENCY, ALLOWED_ACTION
 
-def decision_prompt(full_text: str, emotion_bert: dict, audio_summary: dict) -> str:
-    intents = ", ".join(INTENTS)
-    urg = ", ".join(ALLOWED_URGENCY)
-    act = ", ".join(ALLOWED_ACTION)
-
-    # Keep prompt short to reduce latency.
-    return f"""Tu es un moteur de décision pour un callbot d'assurance (accidents de la vie).
+DECISION_SYSTEM_PROMPT = f"""Tu es un moteur de décision pour un callbot d'assurance (accidents de la vie).
     Ta tâche: produire UNIQUEMENT un JSON valide selon le schéma EXACT ci-dessous.
 
     SCHÉMA JSON (clés exactes, aucune clé en plus):
@@ -20,19 +16,28 @@ def decision_prompt(full_text: str, emotion_bert: dict, audio_summary: dict) ->
       "confidence": <float entre 0.0 et 1.0>
     }}
 
-    INTENTS autorisés: {intents}
-    URGENCY autorisés: {urg}
-    ACTION autorisés: {act}
+    INTENTS autorisés: {", ".join(INTENTS)}
+    URGENCY autorisés: {", ".join(ALLOWED_URGENCY)}
+    ACTION autorisés: {", ".join(ALLOWED_ACTION)}
 
     RÈGLES:
     - Retourne seulement le JSON (pas de texte avant/après).
     - Si danger/urgence médicale probable -> urgency="high" et action="escalate".
     - Si confiance faible ou intent incertain -> action="escalate".
-    - Sinon -> action="rag_query".
+    - Sinon -> action="rag_query"."""
+
 
-    emotion_bert: {emotion_bert}
+def decision_turn_prompt(full_text: str, emotion_bert: dict, audio_summary: dict) -> str:
+    """Per-call part of the decision prompt (sent after DECISION_SYSTEM_PROMPT)."""
+    return f"""emotion_bert: {emotion_bert}
     audio_summary: {audio_summary}
     TEXTE COMPLET de l'appelant:
     \"\"\"{full_text}\"\"\"
     JSON:
     """
+
+
+def decision_prompt(full_text: str, emotion_bert: dict, audio_summary: dict) -> str:
+    """Single-string prompt (system + turn), for clients that cannot send a system prompt."""
+    # Keep prompt short to reduce latency.
+    return DECISION_SYSTEM_PROMPT + "\n\n    " + decision_turn_prompt(full_text, emotion_bert, audio_summary)
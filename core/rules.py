@@ -1,37 +1,178 @@
 # Cheap rules that improve latency and stability.
 # These rules act as a fallback + signal for the LLM (or can be used alone).
+#
+# URG_HIGH, URG_MED and INTENT_KEYWORDS are compiled ONCE at import into a RuleMatcher:
+# - every pattern is precompiled, and the literal text it cannot match without
+#   (e.g. "urgent", or any of "sinistre|accident|dommage") is extracted from its parse tree;
+# - one combined literal regex scans the text once and yields the candidate patterns;
+# - only candidates are confirmed with their own compiled regex.
+# Results are identical to one re.search() per pattern, at a fraction of the cost.
 
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional, Set
 import re
+
+try:  # Python 3.11+
+    import re._parser as _sre_parse
+    from re._constants import LITERAL, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT
+except ImportError:  # Python <= 3.10
+    import sre_parse as _sre_parse
+    from sre_constants import LITERAL, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT
+
 from .static import INTENT_KEYWORDS, URG_HIGH, URG_MED
 
+URG_HIGH_BUCKET = "urg:high"
+URG_MED_BUCKET = "urg:med"
+
+
+def _leading_literal(seq) -> str:
+    out = []
+    for op, av in seq:
+        if op is LITERAL:
+            out.append(chr(av))
+            continue
+        if not out and op is SUBPATTERN and not av[1] and not av[2]:
+            return _leading_literal(av[-1])
+        break
+    return "".join(out)
+
+
+def _required_literals(seq) -> List[Set[str]]:
+    """Sets of literals of which at least one must occur in any match of seq."""
+    found, run = [], []
+
+    def flush():
+        if run:
+            found.append({"".join(run)})
+            run.clear()
+
+    for op, av in seq:
+        if op is LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is SUBPATTERN and not av[1] and not av[2]:
+            found.extend(_required_literals(av[-1]))
+        elif op is BRANCH:
+            prefixes = [_leading_literal(alt) for alt in av[1]]
+            if all(prefixes):
+                found.append(set(prefixes))
+        elif op in (MAX_REPEAT, MIN_REPEAT) and av[0] >= 1:
+            found.extend(_required_literals(av[2]))
+    flush()
+    return found
+
+
+def required_literals(pattern: str) -> Optional[Set[str]]:
+    """Most selective literal set a match of pattern must contain, or None if there is none."""
+    if re.compile(pattern).flags & re.IGNORECASE:
+        return None
+    options = _required_literals(list(_sre_parse.parse(pattern)))
+    if not options:
+        return None
+    return max(options, key=lambda s: (min(len(x) for x in s), -len(s)))
+
+
+class RuleMatcher:
+    """Single-scan matcher for urgency levels and per-intent keyword hits."""
+
+    def __init__(self,
+                 intent_keywords: Dict[str, List[str]] = INTENT_KEYWORDS,
+                 urg_high: List[str] = URG_HIGH,
+                 urg_med: List[str] = URG_MED):
+        # One (bucket, pattern) entry per pattern; bucket is an intent or an urgency bucket.
+        self.entries: List[Tuple[str, str]] = (
+            [(URG_HIGH_BUCKET, p) for p in urg_high]
+            + [(URG_MED_BUCKET, p) for p in urg_med]
+            + [(intent, kw) for intent, kws in intent_keywords.items() for kw in kws]
+        )
+        self.intents = tuple(intent_keywords.keys())
+        self.compiled = [re.compile(p) for _, p in self.entries]
+
+        # Patterns without a usable literal are always confirmed.
+        self.always: List[int] = []
+        by_literal: Dict[str, Set[int]] = {}
+        for i, (_, p) in enumerate(self.entries):
+            lits = required_literals(p)
+            if lits is None:
+                self.always.append(i)
+                continue
+            for lit in lits:
+                by_literal.setdefault(lit, set()).add(i)
+
+        # The scan reports the longest literal starting at each position, so each
+        # literal also triggers the patterns keyed on its prefixes.
+        self._triggers: Dict[str, Set[int]] = {
+            lit: set().union(*(idx for other, idx in by_literal.items() if lit.startswith(other)))
+            for lit in by_literal
+        }
+        if by_literal:
+            alternation = "|".join(re.escape(x) for x in sorted(by_literal, key=len, reverse=True))
+            self._scanner = re.compile(f"(?=({alternation}))")
+        else:
+            self._scanner = None
+
+    def hit_indexes(self, t: str) -> List[int]:
+        """Sorted indexes into self.entries of the patterns found in t (already normalized)."""
+        candidates = set(self.always)
+        if self._scanner is not None:
+            for lit in {m.group(1) for m in self._scanner.finditer(t)}:
+                candidates |= self._triggers[lit]
+        return [i for i in sorted(candidates) if self.compiled[i].search(t)]
+
+    def scan(self, text: str) -> Tuple[str, Dict[str, int]]:
+        """Return (urgency, {intent: hit_count}) from a single scan of text."""
+        t = (text or "").lower().strip()
+        hits = {intent: 0 for intent in self.intents}
+        urgent = medium = False
+        for i in self.hit_indexes(t):
+            bucket = self.entries[i][0]
+            if bucket == URG_HIGH_BUCKET:
+                urgent = True
+            elif bucket == URG_MED_BUCKET:
+                medium = True
+            else:
+                hits[bucket] += 1
+        urgency = "high" if urgent else ("med" if medium else "low")
+        return urgency, hits
+
+
+_MATCHER = RuleMatcher()
+
+
+def scan_rules(text: str) -> Tuple[str, Dict[str, int]]:
+    """Return (urgency, {intent: hit_count}) in one scan."""
+    return _MATCHER.scan(text)
+
+
+def intent_from_hits(hits: Dict[str, int]) -> Tuple[str, float]:
+    """Pick (intent, strength 0..1) from per-intent hit counts (first intent wins ties)."""
+    best_intent, best_hits = "unknown", 0
+    for intent, n in hits.items():
+        if n > best_hits:
+            best_intent, best_hits = intent, n
+    strength = min(1.0, best_hits / 3.0) if best_hits > 0 else 0.0
+    return best_intent, strength
+
+
 def score_urgency(text: str) -> str:
-    t = text.lower()
-    if any(re.search(p, t) for p in URG_HIGH):
-        return "high"
-    if any(re.search(p, t) for p in URG_MED):
-        return "med"
-    return "low"
+    urgency, _ = _MATCHER.scan(text)
+    return urgency
 
 def keyword_intent_prior(text: str, debug: bool = False) -> Tuple[str, float]:
     """Return (intent, strength 0..1) based on keyword hits."""
-    t = text.lower().strip()
-    best_intent, best_hits = "unknown", 0
-    
-    for intent, kws in INTENT_KEYWORDS.items():
-        hits = 0
-        for kw in kws:
-            if re.search(kw, t):
-                hits += 1
-                if debug:
-                    print(f"   🔍 [DEBUG] Match: '{intent}' pattern '{kw}'")
-        
-        if hits > best_hits:
-            best_intent, best_hits = intent, hits
-            
-    strength = min(1.0, best_hits / 3.0) if best_hits > 0 else 0.0
-    
+    t = (text or "").lower().strip()
+    hits = {intent: 0 for intent in _MATCHER.intents}
+
+    for i in _MATCHER.hit_indexes(t):
+        intent, kw = _MATCHER.entries[i]
+        if intent in hits:
+            hits[intent] += 1
+            if debug:
+                print(f"   🔍 [DEBUG] Match: '{intent}' pattern '{kw}'")
+
+    best_intent, strength = intent_from_hits(hits)
+
     if debug:
         print(f"   🔍 [DEBUG] Result: intent='{best_intent}', strength={strength:.2f}")
-    
+
     return best_intent, strength
@@ -62,6 +62,53 @@ INTENT_KEYWORDS = {
     ],
     "unknown": [],
 }
+# Labeled examples for the embedding classifier (one centroid per intent).
+# Include ASR-style variants: missing accents, CNP mis-transcriptions, hesitations.
+INTENT_EXAMPLES = {
+    "greeting": [
+        "bonjour", "bonsoir", "salut", "allô oui", "allo", "bonjour madame",
+        "bonjour je voudrais parler à quelqu'un", "oui bonjour",
+    ],
+    "declare_claim": [
+        "je veux déclarer un sinistre", "je voudrais declarer un accident",
+        "j'ai eu un accident domestique", "je me suis brûlé en cuisinant je veux le déclarer",
+        "j'ai fait une chute dans l'escalier", "ouvrir un dossier sinistre",
+        "signaler un dommage", "je téléphone pour un accident de mon fils",
+    ],
+    "check_status": [
+        "où en est mon dossier", "ou en est mon dossier", "quel est le statut de mon dossier",
+        "suivi de mon dossier sinistre", "quand vais-je recevoir mon indemnisation",
+        "combien de temps pour le règlement", "j'ai un numéro de dossier je voudrais savoir l'avancement",
+    ],
+    "update_info": [
+        "je veux changer mon adresse", "modifier mes coordonnées bancaires",
+        "mettre à jour mon numéro de téléphone", "changer mon rib",
+        "j'ai déménagé il faut modifier mon adresse", "changer le bénéficiaire de mon contrat",
+    ],
+    "complaint": [
+        "je veux faire une réclamation", "je suis mécontent du service",
+        "c'est inadmissible ça fait longtemps que j'attends", "je conteste la décision",
+        "mon dossier a été refusé je ne suis pas d'accord", "je suis furieux",
+        "mauvais service c'est pas normal",
+    ],
+    "general_info": [
+        "quelles sont les garanties de mon contrat", "est-ce que ça couvre les accidents domestiques",
+        "c'est quoi cnp assurance", "cmpa assurance c'est quoi", "semp assurance",
+        "informations sur cnp", "quelles sont les activités de cnp", "qui est couvert par le contrat",
+        "j'ai une question sur mon assurance",
+    ],
+    "payment_info": [
+        "quand est prélevée ma cotisation", "combien je paie par mois",
+        "je n'ai pas reçu mon échéancier", "problème de prélèvement",
+        "comment payer ma prime", "montant de ma cotisation",
+    ],
+    "cancel_policy": [
+        "je veux résilier mon contrat", "comment annuler mon assurance",
+        "résiliation de mon contrat", "je veux arrêter mon assurance",
+        "mettre fin à mon contrat", "resilier",
+    ],
+}
+
 # Urgency rules (hybrid rule+ML design: rules are cheap and reliable).
 URG_HIGH = [
     r"\burgent\b", r"\burgence\b", r"\bh[ôo]pital\b", r"\bambulance\b",
@@ -79,6 +126,10 @@ URG_MED = [
     r"\bconsultation\b", r"\bmedecin\b", r"\bplatre\b"
 ]
 
+# Audio quality thresholds (above these, rules lower the decision confidence).
+SILENCE_RATIO_HIGH = 0.60
+CLIPPING_RATIO_HIGH = 0.05
+
 
 # Default model names (override with env vars in prod)
 # DEFAULT_EMBED_MODEL = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"  # 768-dim
@@ -0,0 +1,24 @@
+"""Two utterances share a decision-cache entry only if the rules cannot tell them apart."""
+
+from core.bench import load_decision_corpus
+from core.cache import decision_cache_key
+from core.decision_engine import decide_rules_only
+
+
+def _variants(text: str):
+    return [text, text.upper(), f"  {text} ", f"{text}.", f"{text} ?", f"{text} !", text.replace("'", "’")]
+
+
+def test_punctuation_is_part_of_the_key():
+    assert decide_rules_only("allo") != decide_rules_only("allo.")
+    assert decision_cache_key("allo", {}, {}) != decision_cache_key("allo.", {}, {})
+    assert decision_cache_key("Allo ", {}, {}) == decision_cache_key("allo", {}, {})
+
+
+def test_same_key_same_rules_decision():
+    decided = {}
+    for text in [row["text"] for row in load_decision_corpus()] + ["allo", "oui", "bonjour", "au revoir"]:
+        for variant in _variants(text):
+            key = decision_cache_key(variant, {}, {})
+            decision = decide_rules_only(variant)
+            assert decided.setdefault(key, decision) == decision, variant
@@ -0,0 +1,24 @@
+"""The decision corpus evaluates the modes: it must not contain the centroid training examples."""
+
+import unicodedata
+
+from core.bench import load_decision_corpus
+from core.cache import normalize_text
+from core.static import INTENT_EXAMPLES
+
+
+def _key(text: str) -> str:
+    """normalize_text + accents folded: an ASR copy of an example without its accents is still a copy."""
+    t = unicodedata.normalize("NFKD", normalize_text(text))
+    return "".join(c for c in t if not unicodedata.combining(c))
+
+
+def test_corpus_does_not_overlap_intent_examples():
+    examples = {_key(text) for texts in INTENT_EXAMPLES.values() for text in texts}
+    overlap = [row["id"] for row in load_decision_corpus() if _key(row["text"]) in examples]
+    assert overlap == []
+
+
+def test_corpus_rows_are_unique():
+    keys = [_key(row["text"]) for row in load_decision_corpus()]
+    assert len(keys) == len(set(keys))
@@ -0,0 +1,46 @@
+"""Distillation trains on LLM-decided turns only, and its decisions go through finalize_decision."""
+
+import json
+
+from core.decision_engine import decide_rules_only
+from core.distill import DistilledDecisionModel, export_from_json, _logged_turns
+from core.static import SILENCE_RATIO_HIGH
+
+LLM_DECISION = {"intent": "declare_claim", "urgency": "med", "action": "rag_query", "confidence": 0.9}
+
+
+def test_only_llm_decided_turns_are_exported():
+    turns = [
+        # twilio_server session entries (callbot_interactions.conversation_history)
+        {"role": "user", "text": "je veux déclarer un sinistre", "decision": LLM_DECISION,
+         "decision_mode": "ollama_llm"},
+        {"role": "assistant", "text": "Bien sûr."},
+        {"role": "user", "text": "bonjour", "decision": decide_rules_only("bonjour"),
+         "decision_mode": "rules_fallback"},
+        {"role": "user", "text": "encore moi", "decision": LLM_DECISION, "decision_mode": "cache_hit"},
+        # db messages (add_conversation_message)
+        {"speaker": "customer", "message_text": "mon dossier de sinistre",
+         "metadata": {"decision": LLM_DECISION, "decision_mode": "ollama_llm"}},
+        {"speaker": "customer", "message_text": "merci", "metadata": {}},
+    ]
+    rows = _logged_turns(turns)
+    assert [r["customer_message"] for r in rows] == ["je veux déclarer un sinistre", "mon dossier de sinistre"]
+    assert all(r["intent"] == "declare_claim" and r["urgency"] == "med" for r in rows)
+
+
+def test_export_from_json_reads_the_message_log(tmp_path):
+    path = tmp_path / "conversations.json"
+    path.write_text(json.dumps([
+        {"speaker": "customer", "message_text": "je veux déclarer un sinistre", "interaction_id": "INT-1",
+         "metadata": {"decision": LLM_DECISION, "decision_mode": "ollama_llm"}},
+    ]), encoding="utf-8")
+    assert export_from_json(path)[0]["customer_message"] == "je veux déclarer un sinistre"
+
+
+def test_decide_applies_audio_penalties():
+    rows = [{"customer_message": text, **decide_rules_only(text)}
+            for text in ("je veux déclarer un sinistre", "bonjour", "où en est mon dossier")] * 4
+    model = DistilledDecisionModel.train(rows, dim=1 << 10, epochs=5)
+    clean = model.decide("je veux déclarer un sinistre")
+    noisy = model.decide("je veux déclarer un sinistre", audio_summary={"silence_ratio": SILENCE_RATIO_HIGH + 0.1})
+    assert noisy["confidence"] == round(max(0.0, clean["confidence"] - 0.15), 3)
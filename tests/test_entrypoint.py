@@ -0,0 +1,123 @@
+"""run_ai_core_batch and arun_ai_core must decide exactly like run_ai_core, in every decision mode."""
+
+from pathlib import Path
+import asyncio
+import json
+import zlib
+
+import numpy as np
+import pytest
+
+from core import entrypoint, graph
+from core.decision_engine import decide_rules_only
+from core.distill import DistilledDecisionModel
+from core.graph import DECISION_MODES
+from core.intent_centroids import CentroidIntentClassifier
+from core.metrics import LATENCY
+from core.ollama_stub import start_stub
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "core" / "data" / "decision_corpus.jsonl"
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words stand-in for the sentence-transformers model (no download)."""
+
+    model_name = "test-hashing"
+
+    def encode(self, texts, batch_size: int = 32) -> np.ndarray:
+        out = np.zeros((len(texts), 256), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in (text or "").lower().split():
+                out[row, zlib.crc32(word.encode("utf-8")) % 256] += 1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1.0, norms)
+
+
+def _texts():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+def _items(n: int = 24):
+    return [(text, {}, {}) for text in _texts()[:n]]
+
+
+def _distilled_model() -> DistilledDecisionModel:
+    rows = [{"customer_message": text, **decide_rules_only(text)} for text in _texts()]
+    return DistilledDecisionModel.train(rows, dim=1 << 10, epochs=5)
+
+
+@pytest.fixture(scope="module")
+def ollama_url():
+    server, url = start_stub()
+    yield url
+    server.shutdown()
+
+
+def _configure(monkeypatch, mode: str, ollama_url: str) -> str:
+    decision_llm = graph._decision_llm
+    monkeypatch.setattr(graph, "_decision_llm",
+                        lambda model, asynchronous=False, base_url=None: decision_llm(model, asynchronous, ollama_url))
+    monkeypatch.setattr(graph, "_shared_classifier",
+                        lambda: CentroidIntentClassifier(embedder=HashingEmbedder(), cache_path=None))
+    monkeypatch.setattr(graph, "_shared_distilled_model", _distilled_model)
+    use_llm = mode in ("llm", "hybrid", "distilled")
+    monkeypatch.setattr(entrypoint, "DECISION_MODE", mode)
+    monkeypatch.setattr(entrypoint, "USE_LLM", use_llm)
+    monkeypatch.setattr(entrypoint, "USE_FAST_PATH", not use_llm)
+    monkeypatch.setattr(entrypoint, "USE_DECISION_CACHE", False)
+    # a generous budget: hybrid turns must not hit the deadline on a loaded test machine
+    monkeypatch.setattr(entrypoint, "LLM_BUDGET_S", 5.0)
+    monkeypatch.setattr(entrypoint, "_APP", None)
+    monkeypatch.setattr(entrypoint, "_AAPP", None)
+    return mode
+
+
+@pytest.fixture(params=DECISION_MODES)
+def mode(request, monkeypatch, ollama_url):
+    return _configure(monkeypatch, request.param, ollama_url)
+
+
+def test_batch_matches_single(mode):
+    items = _items()
+    single = [entrypoint.run_ai_core(*item) for item in items]
+    assert entrypoint.run_ai_core_batch(items) == single
+
+
+def test_async_matches_single(mode):
+    items = _items(8)
+    single = [entrypoint.run_ai_core(*item) for item in items]
+
+    async def decide_all():
+        return [await entrypoint.arun_ai_core(*item) for item in items]
+
+    assert asyncio.run(decide_all()) == single
+
+
+def _decision_modes() -> dict:
+    """{mode: turns} from the "decision.<mode>" histograms, then cleared."""
+    counts = {name.split(".", 1)[1]: h["count"] for name, h in LATENCY.snapshot("decision.").items()}
+    LATENCY.reset()
+    return counts
+
+
+def test_hybrid_batch_wider_than_llm_pool(monkeypatch):
+    """More items and batch workers than LLM workers: the batch must not refuse its own items.
+
+    The stub answers with the rules decision, so the per-turn decision modes are compared too.
+    """
+    from core.llm_ollama import DEFAULT_POOL_SIZE
+
+    server, url = start_stub(latency_ms=50)
+    try:
+        _configure(monkeypatch, "hybrid", url)
+        items = _items(10 * DEFAULT_POOL_SIZE)
+        LATENCY.reset()
+        single = [entrypoint.run_ai_core(*item) for item in items]
+        single_modes = _decision_modes()
+        batch = entrypoint.run_ai_core_batch(items, max_workers=4 * DEFAULT_POOL_SIZE)
+        assert _decision_modes() == single_modes
+        assert "rules_saturated" not in single_modes and single_modes.get("ollama_llm")
+        assert batch == single
+    finally:
+        server.shutdown()
@@ -0,0 +1,9 @@
+"""Importing core.entrypoint must stay cheap: no LLM client, HTTP stack or LangGraph at import time."""
+
+from core.bench import import_time_report
+
+
+def test_entrypoint_import_loads_no_heavy_module():
+    report = import_time_report("core.entrypoint")
+    assert report["total_ms"] > 0, report
+    assert report["heavy_loaded"] == [], report
@@ -0,0 +1,38 @@
+"""Hybrid retrieval answers unambiguous keyword queries from BM25 alone, on the shipped KB."""
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_huggingface")
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from RAG import rag_api
+from RAG.build_index import DEFAULT_KB_PATH, build_index
+
+
+def _embeddings(**kwargs):
+    # Offline stand-in for MiniLM: the fast path decision only depends on BM25.
+    return DeterministicFakeEmbedding(size=384)
+
+
+@pytest.fixture(scope="module")
+def rag(tmp_path_factory):
+    root = tmp_path_factory.mktemp("rag")
+    build_index(DEFAULT_KB_PATH, root / "faiss_index", embeddings=_embeddings(), workers=1)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(rag_api, "HuggingFaceEmbeddings", _embeddings)
+        yield rag_api.RAGKnowledgeBase(index_path=root / "faiss_index", cache_dir=root / "cache",
+                                       semantic_cache_size=0, retrieval_mode="hybrid",
+                                       question_fast_path=False, embedding_backend="torch")
+
+
+@pytest.mark.parametrize("query", ["perco", "espace client", "article 990", "déblocage anticipé"])
+def test_unambiguous_keywords_are_lexical(rag, query):
+    assert rag.search_with_metadata(query)["match_type"] == "lexical"
+
+
+# Tied or near-tied top hits, common terms, and terms the KB does not contain ("3477").
+@pytest.mark.parametrize("query", ["sinistre", "clause bénéficiaire", "assurance", "résidence fiscale", "3477"])
+def test_ambiguous_keywords_are_not_lexical(rag, query):
+    assert rag.search_with_metadata(query)["match_type"] == "hybrid"
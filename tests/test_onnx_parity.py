@@ -0,0 +1,29 @@
+"""The int8 ONNX backend must embed like the torch model (onnx_embeddings.parity_check).
+
+Skipped when onnxruntime / the torch stack is missing or the model is not in the local
+Hugging Face cache: the test never downloads anything.
+"""
+
+import pytest
+
+for module in ("onnxruntime", "tokenizers", "langchain_huggingface", "huggingface_hub"):
+    pytest.importorskip(module)
+
+from huggingface_hub import try_to_load_from_cache
+
+from RAG.onnx_embeddings import EMBEDDING_MODEL, make_embeddings, parity_check
+
+
+@pytest.fixture(scope="module")
+def backends():
+    if not isinstance(try_to_load_from_cache(EMBEDDING_MODEL, "config.json"), str):
+        pytest.skip(f"{EMBEDDING_MODEL} is not in the local Hugging Face cache")
+    try:  # the first ONNX use also exports + quantizes the model (torch, transformers, onnx)
+        return make_embeddings("torch"), make_embeddings("onnx-int8")
+    except (ImportError, OSError) as e:
+        pytest.skip(f"embedding backends unavailable: {e}")
+
+
+def test_onnx_int8_parity(backends):
+    report = parity_check(*backends, min_cosine=0.99)
+    assert report["passed"], report
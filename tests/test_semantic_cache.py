@@ -0,0 +1,40 @@
+"""Audited semantic-cache hits are answered by the real search and counted as audits, not hits."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+from RAG.semantic_cache import SemanticAnswerCache
+
+
+def _cache(audit_rate: float) -> SemanticAnswerCache:
+    cache = SemanticAnswerCache(dim=4, audit_rate=audit_rate, seed=0)
+    cache.store(np.array([1.0, 0.0, 0.0, 0.0]), "key", ["cached"])
+    return cache
+
+
+def test_served_hit():
+    cache = _cache(audit_rate=0.0)
+    result, hit = cache.get_or_search(np.array([1.0, 0.01, 0.0, 0.0]), "key", lambda: ["fresh"])
+    assert (result, hit) == (["cached"], True)
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["audits"], stats["false_hits"]) == (1, 0, 0)
+
+
+def test_audited_hit():
+    cache = _cache(audit_rate=1.0)
+    result, hit = cache.get_or_search(np.array([1.0, 0.01, 0.0, 0.0]), "key", lambda: ["fresh"])
+    assert (result, hit) == (["fresh"], False)
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["audits"], stats["false_hits"]) == (0, 1, 1)
+
+
+def test_batch_audit_path_matches():
+    """lookup + should_audit + record_audit (search_batch) count like get_or_search (search)."""
+    cache = _cache(audit_rate=1.0)
+    hit, _ = cache.lookup(np.array([1.0, 0.01, 0.0, 0.0]), "key")
+    assert hit == ["cached"] and cache.should_audit()
+    cache.record_audit(hit, ["cached"])
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["audits"], stats["false_hits"]) == (0, 1, 0)
@@ -5,6 +5,7 @@ FastAPI application for Callbot REST API
 - POST /api/process      → Pipeline complet (AMI Phone System)
 - POST /api/rag/query    → Recherche RAG directe
 - POST /api/tts/generate → Génération TTS directe
+- POST /api/admin/rag/reload → Hot reload de l'index RAG (X-Admin-Token)
 - GET  /health           → Health check
 
 📥 INPUT FORMAT (from AMI):
@@ -22,7 +23,8 @@ FastAPI application for Callbot REST API
   "confidence": 0.89
 }
 """
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
@@ -35,6 +37,9 @@ from dotenv import load_dotenv
 BASE_DIR = Path(__file__).parent.parent.resolve()
 sys.path.insert(0, str(BASE_DIR))
 sys.path.insert(0, str(BASE_DIR / "RAG"))
+sys.path.insert(0, str(BASE_DIR.parent))  # repo root: core.metrics (stdlib only)
+
+from core.metrics import LATENCY
 
 from src.teams.response_builder import generate_response
 from src.schemas import (
@@ -391,22 +396,62 @@ async def get_stats():
     """
     📊 Get System Statistics
     
-    Returns statistics about the callbot system.
+    Returns statistics about the callbot system, with the latency percentiles
+    of GET /metrics/latency.
     """
     orchestrator = get_orchestrator()
     
     if orchestrator:
         return {
             "status": "operational",
-            "stats": orchestrator.get_stats()
+            "stats": orchestrator.get_stats(),
+            "latency": LATENCY.snapshot()
         }
     else:
         return {
             "status": "initializing",
-            "stats": {}
+            "stats": {},
+            "latency": LATENCY.snapshot()
         }
 
 
+@app.get("/metrics/latency")
+async def latency_metrics():
+    """Latency percentiles (p50/p95/p99) per pipeline stage, same registry and format as twilio_server."""
+    return {"latency": LATENCY.snapshot()}
+
+
+@app.post("/api/admin/rag/reload")
+async def reload_rag_index(force: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    🔄 Hot reload of the RAG index (no restart, live calls keep being answered)
+
+    Loads the version faiss_index/CURRENT points to in a worker thread, then swaps it in;
+    in-flight searches finish on the old version. Requires CALLBOT_ADMIN_TOKEN (header X-Admin-Token).
+    """
+    admin_token = os.getenv("CALLBOT_ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints disabled (CALLBOT_ADMIN_TOKEN unset)"
+        )
+    if x_admin_token != admin_token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
+
+    orchestrator = get_orchestrator()
+    rag = getattr(orchestrator, "rag", None) if orchestrator else None
+    if rag is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="RAG not loaded")
+    try:
+        result = await run_in_threadpool(rag.reload, force)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"RAG reload error: {str(e)}"
+        )
+    return {**result, "index_version": rag.get_stats()["index_version"]}
+
+
 # ===== STARTUP EVENT =====
 
 @app.on_event("startup")
@@ -422,6 +467,8 @@ async def startup_event():
     print("   POST /api/rag/query    → Recherche RAG directe")
     print("   POST /api/tts/generate → Génération TTS directe")
     print("   GET  /api/stats        → Statistiques système")
+    print("   GET  /metrics/latency  → Latences p50/p95/p99 par étape")
+    print("   POST /api/admin/rag/reload → Hot reload index RAG")
     print("   GET  /health           → Health check")
     
     # Pre-initialize orchestrator
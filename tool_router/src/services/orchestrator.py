@@ -11,6 +11,9 @@ from datetime import datetime
 BASE_DIR = Path(__file__).parent.parent.parent.resolve()
 sys.path.insert(0, str(BASE_DIR))
 sys.path.insert(0, str(BASE_DIR.parent.parent / "RAG"))
+sys.path.insert(0, str(BASE_DIR.parent))  # repo root: core.metrics (stdlib only)
+
+from core.metrics import LATENCY
 
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
@@ -151,27 +154,32 @@ class CallbotOrchestrator:
         start_time = time.time()
         self.stats["total_requests"] += 1
         
-        routing_result = self._route_query(request.text)
+        # Stage latencies go to the same registry as the AI Core (GET /metrics/latency)
+        with LATENCY.timer("tool_router.route"):
+            routing_result = self._route_query(request.text)
         action = routing_result.get("action", "rag_response")
         
-        if action == "human_handoff":
-            response = self._handle_handoff(request, routing_result)
-        elif action == "crm_action":
-            response = self._handle_crm(request, routing_result)
-        else:
-            response = self._handle_rag(request, routing_result)
+        with LATENCY.timer(f"tool_router.{action}"):
+            if action == "human_handoff":
+                response = self._handle_handoff(request, routing_result)
+            elif action == "crm_action":
+                response = self._handle_crm(request, routing_result)
+            else:
+                response = self._handle_rag(request, routing_result)
         
         if self.enable_tts and self.tts:
-            audio_result = self.tts.generate_speech(
-                text=response.response_text,
-                emotion=request.emotion
-            )
+            with LATENCY.timer("tool_router.tts"):
+                audio_result = self.tts.generate_speech(
+                    text=response.response_text,
+                    emotion=request.emotion
+                )
             response.audio_base64 = audio_result.get("audio_base64", "")
             response.metadata["tts_generation_ms"] = audio_result.get("generation_time", 0) * 1000
             response.metadata["tts_cached"] = audio_result.get("cached", False)
         
         total_time_ms = (time.time() - start_time) * 1000
         response.metadata["total_response_time_ms"] = round(total_time_ms, 2)
+        LATENCY.observe("tool_router.process", total_time_ms)
         
         self.stats["total_response_time_ms"] += total_time_ms
         self.stats["avg_response_time_ms"] = (
@@ -289,7 +297,8 @@ class CallbotOrchestrator:
             **self.stats,
             "tts_enabled": self.enable_tts,
             "llm_enabled": self.enable_llm,
-            "router_available": self.router is not None
+            "router_available": self.router is not None,
+            "rag": self.rag.get_stats() if self.rag else None
         }
 
 